@@ -0,0 +1,29 @@
+"""add transaction quote_id
+
+Revision ID: b7c2d41f0a93
+Revises: e9d0ff9dab41
+Create Date: 2026-10-19 15:10:42.118203
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7c2d41f0a93'
+down_revision: Union[str, None] = 'e9d0ff9dab41'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade():
+    # A quote can fund at most one transfer, across all workers
+    op.add_column('transactions', sa.Column('quote_id', sa.String(512), nullable=True))
+    op.create_unique_constraint('uq_transactions_quote_id', 'transactions', ['quote_id'])
+
+
+def downgrade():
+    op.drop_constraint('uq_transactions_quote_id', 'transactions', type_='unique')
+    op.drop_column('transactions', 'quote_id')
@@ -0,0 +1,147 @@
+from collections import OrderedDict
+from fastapi import BackgroundTasks, HTTPException, Request
+import asyncio
+import heapq
+import math
+import time
+
+from . import config
+from .logger import logger
+from .storage import open_storage
+
+
+def too_many_requests(detail: str, retry_after: float) -> HTTPException:
+    return HTTPException(
+        status_code=429,
+        detail=detail,
+        headers={"Retry-After": str(max(1, math.ceil(retry_after)))}
+    )
+
+
+class ClientRateLimiter:
+    """Token bucket per client, bounded to the most recently seen clients"""
+
+    def __init__(self, rate: float, burst: int, max_clients: int):
+        self.rate = rate
+        self.burst = burst
+        self.max_clients = max_clients
+        self._buckets = OrderedDict()
+
+    def take(self, client_id: str) -> float:
+        """Take a token; returns 0 if admitted, else seconds until one is available"""
+        now = time.monotonic()
+        tokens, updated = self._buckets.pop(client_id, (self.burst, now))
+        tokens = min(self.burst, tokens + (now - updated) * self.rate)
+
+        retry_after = 0.0
+        if tokens >= 1:
+            tokens -= 1
+        else:
+            retry_after = (1 - tokens) / self.rate
+
+        self._buckets[client_id] = (tokens, now)
+        if len(self._buckets) > self.max_clients:
+            self._buckets.popitem(last=False)
+        return retry_after
+
+
+def _settlement_seconds(pair: str) -> float:
+    source_currency, target_currency = pair.split("/")
+    return config.SETTLEMENT_TIMES[source_currency] + config.SETTLEMENT_TIMES[target_currency]
+
+
+class SettlementLimiter:
+    """Bounds in-flight settlements per currency pair.
+
+    A tracked slot is released when its settlement finishes, or expires
+    SETTLEMENT_SLOT_GRACE_SECONDS after the settlement was due in case the
+    background task never ran.
+    """
+
+    def __init__(self, limit: int, grace_seconds: float = config.SETTLEMENT_SLOT_GRACE_SECONDS):
+        self.limit = limit
+        self.grace_seconds = grace_seconds
+        self.in_flight = {}
+        self._transactions = {}
+        self._deadlines = []
+
+    def acquire(self, source_currency: str, target_currency: str) -> str:
+        pair = f"{source_currency}/{target_currency}"
+        self._expire()
+        if self.in_flight.get(pair, 0) >= self.limit:
+            logger.warning(f"Rejecting transfer: {self.limit} settlements in flight for {pair}")
+            raise too_many_requests(f"Too many settlements in flight for {pair}", _settlement_seconds(pair))
+        self.in_flight[pair] = self.in_flight.get(pair, 0) + 1
+        return pair
+
+    def track(self, transaction_id: int, pair: str):
+        """Hand a slot over to the transaction's settlement"""
+        self._transactions[transaction_id] = pair
+        deadline = time.monotonic() + _settlement_seconds(pair) + self.grace_seconds
+        heapq.heappush(self._deadlines, (deadline, transaction_id))
+
+    def release(self, pair: str):
+        self.in_flight[pair] -= 1
+
+    def finish(self, transaction_id: int):
+        pair = self._transactions.pop(transaction_id, None)
+        if pair is not None:
+            self.release(pair)
+
+    def _expire(self):
+        now = time.monotonic()
+        while self._deadlines and self._deadlines[0][0] <= now:
+            _, transaction_id = heapq.heappop(self._deadlines)
+            if transaction_id in self._transactions:
+                logger.warning(f"Settlement slot for transaction {transaction_id} expired")
+                self.finish(transaction_id)
+
+
+client_rate_limiter = ClientRateLimiter(
+    config.TRANSFER_RATE_LIMIT_PER_SECOND,
+    config.TRANSFER_RATE_LIMIT_BURST,
+    config.RATE_LIMIT_MAX_CLIENTS
+)
+settlement_limiter = SettlementLimiter(config.MAX_INFLIGHT_SETTLEMENTS_PER_PAIR)
+
+# Transfer requests share what is left of the DB pool once FX ingestion, the
+# rebalancer and settlements have their connections set aside. Settlements
+# have their own budget so they never wait on a request's slot.
+transfer_connections = asyncio.Semaphore(config.TRANSFER_CONNECTION_LIMIT)
+settlement_connections = asyncio.Semaphore(config.SETTLEMENT_CONNECTIONS)
+
+
+async def limit_client(request: Request):
+    # Keyed on the connection address; client-supplied headers are not trusted
+    client_id = request.client.host if request.client else "unknown"
+    retry_after = client_rate_limiter.take(client_id)
+    if retry_after:
+        logger.warning(f"Rate limited client {client_id}")
+        raise too_many_requests("Rate limit exceeded", retry_after)
+
+
+async def get_transfer_storage(background_tasks: BackgroundTasks):
+    """Storage dependency for transfer endpoints; fails fast when at capacity"""
+    if transfer_connections.locked():
+        logger.warning("Rejecting request: transfer connection capacity exhausted")
+        raise too_many_requests("Server is at capacity", 1)
+
+    await transfer_connections.acquire()
+    storage = open_storage()
+    released = False
+
+    async def release():
+        nonlocal released
+        if not released:
+            released = True
+            storage.close()
+            transfer_connections.release()
+
+    # Background tasks run in order, so this returns the slot before any
+    # settlement the endpoint schedules; newer FastAPI versions only run
+    # dependency cleanup after background tasks have finished
+    background_tasks.add_task(release)
+    try:
+        yield storage
+    finally:
+        await release()
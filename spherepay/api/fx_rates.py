@@ -1,15 +1,14 @@
 from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
 
-from ..database import get_db
+from ..storage import Storage, get_storage
 from ..schemas.fx_rate import FxRateUpdate, FxRateResponse
 from ..services.fx_rate import FxRateService
 
 router = APIRouter()
 
 @router.post("/fx-rate")
-async def update_fx_rate(rate_update: FxRateUpdate, db: Session = Depends(get_db)):
-    fx_service = FxRateService(db)
+async def update_fx_rate(rate_update: FxRateUpdate, storage: Storage = Depends(get_storage)):
+    fx_service = FxRateService(storage)
     fx_rate = fx_service.create_rate(rate_update)
     return FxRateResponse(
         pair=fx_rate.currency_pair,
@@ -18,8 +17,8 @@ async def update_fx_rate(rate_update: FxRateUpdate, db: Session = Depends(get_db
     )
 
 @router.get("/fx-rate/{base}-{quote}")
-async def get_latest_rate(base: str, quote: str, db: Session = Depends(get_db)):
-    fx_service = FxRateService(db)
+async def get_latest_rate(base: str, quote: str, storage: Storage = Depends(get_storage)):
+    fx_service = FxRateService(storage)
     latest_rate = fx_service.get_latest_rate(base, quote)
     return FxRateResponse(
         pair=latest_rate.currency_pair,
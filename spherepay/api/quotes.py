@@ -0,0 +1,13 @@
+from fastapi import APIRouter, Depends
+
+from ..admission import get_transfer_storage
+from ..storage import Storage
+from ..schemas.quote import QuoteRequest
+from ..services.quote import QuoteService
+
+router = APIRouter()
+
+@router.post("/quote")
+async def create_quote(request: QuoteRequest, storage: Storage = Depends(get_transfer_storage)):
+    quote_service = QuoteService(storage)
+    return quote_service.create_quote(request)
@@ -1,46 +1,29 @@
 from fastapi import APIRouter, Depends, BackgroundTasks
-from sqlalchemy.orm import Session
 
-from ..database import get_db
+from ..admission import get_transfer_storage, limit_client, settlement_limiter
+from ..storage import Storage
 from ..schemas.transaction import TransactionRequest, TransactionResponse
 from ..services.transaction import TransactionService
 
 router = APIRouter()
 
-@router.post("/transfer")
+@router.post("/transfer", dependencies=[Depends(limit_client)])
 async def create_transfer(
     request: TransactionRequest,
     background_tasks: BackgroundTasks,
-    db: Session = Depends(get_db)
+    storage: Storage = Depends(get_transfer_storage)
 ):
-    transaction_service = TransactionService(db)
-    transaction = transaction_service.create_transaction(request, background_tasks)
-    return TransactionResponse(
-        id=transaction.id,
-        source_currency=transaction.source_currency,
-        target_currency=transaction.target_currency,
-        source_amount=str(transaction.source_amount),
-        target_amount=str(transaction.target_amount),
-        fx_rate=str(transaction.fx_rate),
-        margin=str(transaction.margin),
-        status=transaction.status,
-        created_at=transaction.created_at,
-        settled_at=transaction.settled_at
-    )
+    pair = settlement_limiter.acquire(request.source_currency, request.target_currency)
+    try:
+        transaction_service = TransactionService(storage)
+        transaction = transaction_service.create_transaction(request, background_tasks)
+    except Exception:
+        settlement_limiter.release(pair)
+        raise
+    settlement_limiter.track(transaction.id, pair)
+    return TransactionResponse.from_transaction(transaction)
 
 @router.get("/transfer/{transfer_id}")
-async def get_transfer(transfer_id: int, db: Session = Depends(get_db)):
-    transaction_service = TransactionService(db)
-    transaction = transaction_service.get_transaction(transfer_id)
-    return TransactionResponse(
-        id=transaction.id,
-        source_currency=transaction.source_currency,
-        target_currency=transaction.target_currency,
-        source_amount=str(transaction.source_amount),
-        target_amount=str(transaction.target_amount),
-        fx_rate=str(transaction.fx_rate),
-        margin=str(transaction.margin),
-        status=transaction.status,
-        created_at=transaction.created_at,
-        settled_at=transaction.settled_at
-    ) 
\ No newline at end of file
+async def get_transfer(transfer_id: int, storage: Storage = Depends(get_transfer_storage)):
+    transaction_service = TransactionService(storage)
+    return transaction_service.get_transaction_response(transfer_id) 
\ No newline at end of file
@@ -0,0 +1,144 @@
+from collections import OrderedDict
+from pydantic import ValidationError
+from typing import Optional
+import threading
+import time
+
+from . import config
+from .logger import logger
+from .models.transaction import TransactionStatus
+from .schemas.transaction import TransactionResponse
+
+
+TERMINAL_STATUSES = {TransactionStatus.COMPLETED, TransactionStatus.FAILED}
+
+
+class CacheBackend:
+    """Key/value store for serialized payloads"""
+
+    def get(self, key: str) -> Optional[str]:
+        raise NotImplementedError
+
+    def set(self, key: str, value: str, ttl: Optional[float] = None):
+        raise NotImplementedError
+
+    def delete(self, key: str):
+        raise NotImplementedError
+
+
+class LocalCacheBackend(CacheBackend):
+    """Bounded in-process LRU cache with optional per-entry TTL"""
+
+    def __init__(self, max_entries: int = config.CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: str, ttl: Optional[float] = None):
+        expires_at = time.monotonic() + ttl if ttl is not None else None
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: str):
+        with self._lock:
+            self._entries.pop(key, None)
+
+
+class RedisCacheBackend(CacheBackend):
+    """Redis-backed cache shared between worker processes"""
+
+    def __init__(self, url: str):
+        import redis
+
+        self.client = redis.Redis.from_url(url, decode_responses=True)
+
+    def get(self, key: str) -> Optional[str]:
+        return self.client.get(key)
+
+    def set(self, key: str, value: str, ttl: Optional[float] = None):
+        if ttl is None:
+            self.client.set(key, value)
+        else:
+            self.client.set(key, value, px=max(1, int(ttl * 1000)))
+
+    def delete(self, key: str):
+        self.client.delete(key)
+
+
+class TransactionCache:
+    """Read-through cache of serialized transaction responses.
+
+    Settled (COMPLETED/FAILED) transactions never change, so they are kept
+    for TRANSACTION_CACHE_SETTLED_TTL_SECONDS or until evicted. In-flight
+    transactions expire quickly and are invalidated on every status change
+    in process_settlement. Unreadable payloads, e.g. written by an older
+    schema to a shared Redis, are dropped and read from storage instead.
+    """
+
+    def __init__(self, backend: CacheBackend):
+        self.backend = backend
+
+    @staticmethod
+    def _key(transaction_id: int) -> str:
+        return f"spherepay:transaction:{transaction_id}"
+
+    def get(self, transaction_id: int) -> Optional[TransactionResponse]:
+        try:
+            payload = self.backend.get(self._key(transaction_id))
+        except Exception as e:
+            logger.warning(f"Transaction cache read failed: {str(e)}")
+            return None
+
+        if payload is None:
+            return None
+        try:
+            return TransactionResponse.model_validate_json(payload)
+        except ValidationError as e:
+            logger.warning(f"Discarding unreadable cache entry for transaction {transaction_id}: {str(e)}")
+            self.invalidate(transaction_id)
+            return None
+
+    def put(self, response: TransactionResponse):
+        if response.status in TERMINAL_STATUSES:
+            ttl = config.TRANSACTION_CACHE_SETTLED_TTL_SECONDS
+        else:
+            ttl = config.TRANSACTION_CACHE_TTL_SECONDS.get(response.status.value)
+            if ttl is None:
+                return
+
+        try:
+            self.backend.set(self._key(response.id), response.model_dump_json(), ttl)
+        except Exception as e:
+            logger.warning(f"Transaction cache write failed: {str(e)}")
+
+    def invalidate(self, transaction_id: int):
+        try:
+            self.backend.delete(self._key(transaction_id))
+        except Exception as e:
+            logger.warning(f"Transaction cache invalidation failed: {str(e)}")
+
+
+def create_backend() -> CacheBackend:
+    if config.CACHE_URL:
+        return RedisCacheBackend(config.CACHE_URL)
+    return LocalCacheBackend()
+
+
+transaction_cache = TransactionCache(create_backend())
@@ -0,0 +1,272 @@
+"""Compact columnar archive of FX tick history.
+
+Layout (little-endian):
+
+    header       magic b"SPFX", version u16, rate scale u16, pair count u32
+    pair table   per pair: pair code (8 bytes, NUL padded), offset u64, count u64
+    padding      to an 8-byte boundary
+    timestamps   int64 microseconds since the Unix epoch, UTC
+    rates        int64 fixed point, rate * 10**scale
+
+Both columns are partitioned by pair: a pair's ticks occupy
+[offset, offset + count) in each column, sorted by timestamp. Columns are
+8-byte aligned so they can be memory-mapped and viewed without copying on
+little-endian hosts; big-endian hosts get byteswapped copies.
+
+    python -m spherepay.fx_archive export ticks.spfx
+    python -m spherepay.fx_archive replay ticks.spfx --speed 60
+"""
+from array import array
+from datetime import datetime, UTC, timedelta
+from decimal import Decimal
+from sqlalchemy import BigInteger, cast, func, select
+from sqlalchemy.orm import Session
+from typing import Iterator, Optional
+import argparse
+import heapq
+import mmap
+import struct
+import sys
+import time
+
+from .database import SessionLocal
+from .logger import logger
+from .models.fx_rate import FxRate
+from .money import SCALE
+from .schemas.fx_rate import FxRateUpdate
+from .services.fx_rate import FxRateService
+from .storage import MemoryStorage, SqlStorage, Storage
+
+MAGIC = b"SPFX"
+VERSION = 1
+RATE_SCALE = SCALE  # Matches Numeric(20, 6) on fx_rates.rate
+HEADER = struct.Struct("<4sHHI")
+PAIR_ENTRY = struct.Struct("<8sQQ")
+EPOCH = datetime(1970, 1, 1, tzinfo=UTC)
+
+
+def _columns_offset(pair_count: int) -> int:
+    end = HEADER.size + pair_count * PAIR_ENTRY.size
+    return (end + 7) & ~7
+
+
+def write_archive(path: str, ticks: dict[str, tuple[array, array]], scale: int = RATE_SCALE):
+    """Write per-pair (timestamps, rates) int64 arrays, each sorted by time"""
+    pairs = sorted(ticks)
+    total = sum(len(ticks[pair][0]) for pair in pairs)
+
+    with open(path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, scale, len(pairs)))
+        offset = 0
+        for pair in pairs:
+            count = len(ticks[pair][0])
+            f.write(PAIR_ENTRY.pack(pair.encode(), offset, count))
+            offset += count
+        f.write(b"\0" * (_columns_offset(len(pairs)) - f.tell()))
+
+        for column in (0, 1):
+            for pair in pairs:
+                values = ticks[pair][column]
+                if sys.byteorder != "little":
+                    values = array("q", values)
+                    values.byteswap()
+                values.tofile(f)
+
+    logger.info(f"Wrote {total} FX ticks for {len(pairs)} pairs to {path}")
+
+
+def export_archive(db: Session, path: str, since: Optional[datetime] = None,
+                   until: Optional[datetime] = None, batch_size: int = 100_000):
+    """Export fx_rates into an archive without materializing ORM objects"""
+    scale = 10 ** RATE_SCALE
+    # Convert in Postgres so rows arrive as plain integers
+    query = select(
+        FxRate.currency_pair,
+        cast(func.round(func.extract("epoch", FxRate.timestamp) * 1_000_000), BigInteger),
+        cast(func.round(FxRate.rate * scale), BigInteger)
+    ).order_by(FxRate.currency_pair, FxRate.timestamp)
+    if since is not None:
+        query = query.where(FxRate.timestamp >= since)
+    if until is not None:
+        query = query.where(FxRate.timestamp < until)
+
+    ticks = {}
+    result = db.execute(query.execution_options(yield_per=batch_size))
+    for pair, timestamp, rate in result:
+        columns = ticks.get(pair)
+        if columns is None:
+            columns = ticks[pair] = (array("q"), array("q"))
+        columns[0].append(timestamp)
+        columns[1].append(rate)
+
+    write_archive(path, ticks)
+
+
+class FxArchive:
+    """Memory-mapped reader for an FX tick archive"""
+
+    def __init__(self, path: str):
+        self._file = open(path, "rb")
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, self.scale, pair_count = HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError(f"{path} is not a version {VERSION} FX archive")
+
+        self.partitions = {}
+        for index in range(pair_count):
+            code, offset, count = PAIR_ENTRY.unpack_from(
+                self._mmap, HEADER.size + index * PAIR_ENTRY.size
+            )
+            self.partitions[code.rstrip(b"\0").decode()] = (offset, count)
+
+        self.total = sum(count for _, count in self.partitions.values())
+        self._timestamps_offset = _columns_offset(pair_count)
+        self._rates_offset = self._timestamps_offset + self.total * 8
+
+    @property
+    def pairs(self) -> list[str]:
+        return list(self.partitions)
+
+    def timestamps(self, pair: str) -> memoryview:
+        """int64 view of a pair's timestamps (microseconds, UTC)"""
+        return self._column(self._timestamps_offset, pair)
+
+    def rates(self, pair: str) -> memoryview:
+        """int64 view of a pair's fixed-point rates"""
+        return self._column(self._rates_offset, pair)
+
+    def to_numpy(self, pair: str):
+        """Zero-copy NumPy (timestamps, rates) arrays for a pair; requires numpy"""
+        import numpy as np
+
+        offset, count = self.partitions[pair]
+        dtype = np.dtype("<i8")
+        return (
+            np.frombuffer(self._mmap, dtype, count, self._timestamps_offset + offset * 8),
+            np.frombuffer(self._mmap, dtype, count, self._rates_offset + offset * 8)
+        )
+
+    def ticks(self, pairs: Optional[list[str]] = None) -> Iterator[tuple[int, str, int]]:
+        """Yield (timestamp, pair, rate) across pairs in time order"""
+        return heapq.merge(*(self._pair_ticks(pair) for pair in (pairs or self.pairs)))
+
+    def to_datetime(self, timestamp: int) -> datetime:
+        return EPOCH + timedelta(microseconds=timestamp)
+
+    def to_decimal(self, rate: int) -> Decimal:
+        return Decimal(rate).scaleb(-self.scale)
+
+    def close(self):
+        """Close the archive; the mapping stays open while views are still alive.
+
+        Views from timestamps(), rates() and to_numpy() pin the mapping, so it
+        is then left for the garbage collector to unmap once they are dropped.
+        """
+        try:
+            self._mmap.close()
+        except BufferError:
+            logger.debug("FX archive views still in use; deferring unmap to GC")
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _pair_ticks(self, pair: str) -> Iterator[tuple[int, str, int]]:
+        for timestamp, rate in zip(self.timestamps(pair), self.rates(pair)):
+            yield timestamp, pair, rate
+
+    def _column(self, column_offset: int, pair: str) -> memoryview:
+        offset, count = self.partitions[pair]
+        start = column_offset + offset * 8
+        view = memoryview(self._mmap)[start:start + count * 8]
+        if sys.byteorder != "little":
+            values = array("q")
+            values.frombytes(view)
+            view.release()
+            values.byteswap()
+            return memoryview(values)
+        return view.cast("q")
+
+
+def replay(archive: FxArchive, storage: Storage, speed: Optional[float] = None,
+           via_service: bool = True, pairs: Optional[list[str]] = None) -> int:
+    """Feed archived ticks back into storage.
+
+    With via_service, ticks go through FxRateService.create_rate as if posted
+    to /fx-rate; otherwise they are written straight to storage. speed is a
+    multiple of the original pace; None replays as fast as possible. On
+    MemoryStorage the clock follows the replayed ticks.
+    """
+    fx_service = FxRateService(storage)
+    started = time.monotonic()
+    first_timestamp = None
+    count = 0
+
+    for timestamp, pair, rate in archive.ticks(pairs):
+        if speed:
+            if first_timestamp is None:
+                first_timestamp = timestamp
+            delay = (timestamp - first_timestamp) / 1_000_000 / speed - (time.monotonic() - started)
+            if delay > 0:
+                time.sleep(delay)
+
+        tick_time = archive.to_datetime(timestamp)
+        tick_rate = archive.to_decimal(rate)
+        if isinstance(storage, MemoryStorage):
+            storage.clock = tick_time
+
+        if via_service:
+            fx_service.create_rate(FxRateUpdate(pair=pair, rate=str(tick_rate), timestamp=tick_time))
+        else:
+            storage.add_rate(FxRate(currency_pair=pair, rate=tick_rate, timestamp=tick_time))
+            storage.commit()
+        count += 1
+
+    return count
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export and replay FX tick history")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    export_parser = commands.add_parser("export", help="Export fx_rates to an archive")
+    export_parser.add_argument("path")
+    export_parser.add_argument("--since", type=datetime.fromisoformat)
+    export_parser.add_argument("--until", type=datetime.fromisoformat)
+
+    replay_parser = commands.add_parser("replay", help="Replay an archive")
+    replay_parser.add_argument("path")
+    replay_parser.add_argument("--speed", type=float, help="Multiple of the original pace; omit for max speed")
+    replay_parser.add_argument("--pair", action="append", dest="pairs")
+    replay_parser.add_argument("--target", choices=["db", "memory"], default="memory")
+    args = parser.parse_args()
+
+    if args.command == "export":
+        db = SessionLocal()
+        try:
+            export_archive(db, args.path, args.since, args.until)
+        finally:
+            db.close()
+        return
+
+    with FxArchive(args.path) as archive:
+        if args.target == "db":
+            storage = SqlStorage(SessionLocal())
+        else:
+            storage = MemoryStorage()
+
+        started = time.perf_counter()
+        try:
+            count = replay(archive, storage, args.speed, via_service=args.target == "db", pairs=args.pairs)
+        finally:
+            storage.close()
+        logger.info(f"Replayed {count} FX ticks in {time.perf_counter() - started:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
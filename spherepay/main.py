@@ -1,9 +1,9 @@
 from fastapi import FastAPI
-from contextlib import asynccontextmanager
+from contextlib import asynccontextmanager, suppress
 import asyncio
 
 from .tasks import rebalance_pools_task
-from .api import fx_rates, transfers
+from .api import fx_rates, quotes, transfers
 
 
 @asynccontextmanager
@@ -11,9 +11,13 @@ async def lifespan(app: FastAPI):
     rebalance_task = asyncio.create_task(rebalance_pools_task())
     yield
     rebalance_task.cancel()
+    # Let the task release rebalancer leadership before the worker exits
+    with suppress(asyncio.CancelledError):
+        await rebalance_task
 
 app = FastAPI(lifespan=lifespan)
 
 # Include routers
 app.include_router(fx_rates.router)
+app.include_router(quotes.router)
 app.include_router(transfers.router)
@@ -22,4 +22,5 @@ class Transaction(Base):
     revenue = Column(Numeric(precision=20, scale=6), nullable=False)
     status = Column(Enum(TransactionStatus), nullable=False, default=TransactionStatus.PENDING)
     created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
-    settled_at = Column(DateTime(timezone=True)) 
\ No newline at end of file
+    settled_at = Column(DateTime(timezone=True))
+    quote_id = Column(String(512), unique=True)  # Set when funded by a quote 
\ No newline at end of file
@@ -0,0 +1,164 @@
+"""Fixed-point money and rate values backed by scaled integers.
+
+Amounts and rates are held as integer units of 10**-SCALE, the scale of the
+Numeric(20, 6) columns, so conversion to and from DB numerics is exact and
+arithmetic never goes through Decimal contexts. Rounding is always explicit:
+products are rounded half-even back to SCALE, and Money.round() applies the
+currency's own precision from config.CURRENCY_DECIMALS (Money.round_down()
+where a remainder must never favor the customer).
+"""
+from decimal import Decimal, ROUND_HALF_EVEN
+from functools import total_ordering
+from typing import Iterable, Union
+
+from . import config
+
+SCALE = 6
+FACTOR = 10 ** SCALE
+MAX_UNITS = 10 ** 20  # Numeric(20, 6) holds magnitudes below 10**14
+
+
+def _div_round(numerator: int, denominator: int) -> int:
+    """Integer division rounded half-even"""
+    quotient, remainder = divmod(numerator, denominator)
+    twice = 2 * remainder
+    if twice > denominator or (twice == denominator and quotient % 2):
+        quotient += 1
+    return quotient
+
+
+def _to_units(value: Union[Decimal, str, int]) -> int:
+    value = value if isinstance(value, Decimal) else Decimal(value)
+    return int(value.scaleb(SCALE).to_integral_value(ROUND_HALF_EVEN))
+
+
+class Rate:
+    """Exchange rate or dimensionless factor in units of 10**-SCALE"""
+
+    __slots__ = ("units",)
+
+    def __init__(self, units: int):
+        self.units = units
+
+    @classmethod
+    def from_decimal(cls, value: Union[Decimal, str, int]) -> "Rate":
+        return cls(_to_units(value))
+
+    def to_decimal(self) -> Decimal:
+        return Decimal(self.units).scaleb(-SCALE)
+
+    def __eq__(self, other):
+        return isinstance(other, Rate) and self.units == other.units
+
+    def __hash__(self):
+        return hash(self.units)
+
+    def __repr__(self):
+        return f"Rate({self.to_decimal()})"
+
+    def __str__(self):
+        return str(self.to_decimal())
+
+
+@total_ordering
+class Money:
+    """Amount of a currency in units of 10**-SCALE"""
+
+    __slots__ = ("units", "currency")
+
+    def __init__(self, units: int, currency: str):
+        self.units = units
+        self.currency = currency
+
+    @classmethod
+    def zero(cls, currency: str) -> "Money":
+        return cls(0, currency)
+
+    @classmethod
+    def from_decimal(cls, value: Union[Decimal, str, int], currency: str) -> "Money":
+        return cls(_to_units(value), currency)
+
+    @classmethod
+    def from_decimals(cls, values: Iterable[Decimal], currency: str) -> list["Money"]:
+        """Bulk conversion of DB numerics"""
+        return [cls(_to_units(value), currency) for value in values]
+
+    def to_decimal(self) -> Decimal:
+        return Decimal(self.units).scaleb(-SCALE)
+
+    def round(self) -> "Money":
+        """Round half-even to the currency's precision"""
+        step = 10 ** (SCALE - config.CURRENCY_DECIMALS[self.currency])
+        return Money(_div_round(self.units, step) * step, self.currency)
+
+    def round_down(self) -> "Money":
+        """Round toward negative infinity to the currency's precision"""
+        step = 10 ** (SCALE - config.CURRENCY_DECIMALS[self.currency])
+        return Money(self.units // step * step, self.currency)
+
+    def convert(self, rate: Rate, currency: str) -> "Money":
+        """Convert into another currency, rounded to SCALE"""
+        return Money(_div_round(self.units * rate.units, FACTOR), currency)
+
+    def _check(self, other: "Money"):
+        if not isinstance(other, Money):
+            raise TypeError(f"Expected Money, got {type(other).__name__}")
+        if other.currency != self.currency:
+            raise ValueError(f"Currency mismatch: {self.currency} and {other.currency}")
+
+    def __add__(self, other: "Money") -> "Money":
+        self._check(other)
+        return Money(self.units + other.units, self.currency)
+
+    def __sub__(self, other: "Money") -> "Money":
+        self._check(other)
+        return Money(self.units - other.units, self.currency)
+
+    def __mul__(self, factor: Union[Rate, Decimal, int]) -> "Money":
+        if isinstance(factor, int):
+            return Money(self.units * factor, self.currency)
+        if isinstance(factor, Decimal):
+            factor = Rate.from_decimal(factor)
+        return Money(_div_round(self.units * factor.units, FACTOR), self.currency)
+
+    def __neg__(self) -> "Money":
+        return Money(-self.units, self.currency)
+
+    def __abs__(self) -> "Money":
+        return Money(abs(self.units), self.currency)
+
+    def __bool__(self):
+        return self.units != 0
+
+    def __eq__(self, other):
+        return (
+            isinstance(other, Money) and
+            self.currency == other.currency and
+            self.units == other.units
+        )
+
+    def __lt__(self, other: "Money") -> bool:
+        self._check(other)
+        return self.units < other.units
+
+    def __hash__(self):
+        return hash((self.units, self.currency))
+
+    def __repr__(self):
+        return f"Money({self.to_decimal()}, {self.currency})"
+
+    def __str__(self):
+        return str(self.to_decimal())
+
+
+def to_decimals(values: Iterable[Money]) -> list[Decimal]:
+    """Bulk conversion to DB numerics"""
+    return [value.to_decimal() for value in values]
+
+
+def ratio(numerator: Money, denominator: Money) -> Decimal:
+    """Dimensionless ratio of two amounts in the same currency"""
+    numerator._check(denominator)
+    if denominator.units == 0:
+        return Decimal('0')
+    return Decimal(numerator.units) / Decimal(denominator.units)
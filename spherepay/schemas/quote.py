@@ -0,0 +1,54 @@
+from pydantic import BaseModel, field_validator, model_validator
+from decimal import Decimal
+from datetime import datetime
+from .. import config
+
+# Source amounts only; converted target amounts are checked in apply_margin
+MAX_AMOUNT = Decimal("1e12")
+
+
+class QuoteRequest(BaseModel):
+    source_currency: str
+    target_currency: str
+    source_amount: str  # String to handle decimal precision
+
+    @field_validator('source_currency', 'target_currency')
+    def validate_currency(cls, v):
+        if v not in {'USD', 'EUR', 'JPY', 'GBP', 'AUD'}:
+            raise ValueError(f"Unsupported currency: {v}")
+        return v
+
+    @field_validator('source_amount')
+    def validate_amount(cls, v):
+        try:
+            amount = Decimal(v)
+            if not amount.is_finite():
+                raise ValueError("Amount must be a finite number")
+            if amount <= 0:
+                raise ValueError("Amount must be positive")
+            if amount >= MAX_AMOUNT:
+                raise ValueError(f"Amount must be less than {MAX_AMOUNT:f}")
+            return v
+        except Exception as e:
+            raise ValueError(f"Invalid amount format: {str(e)}")
+
+    @model_validator(mode='after')
+    def validate_amount_precision(self):
+        decimals = config.CURRENCY_DECIMALS[self.source_currency]
+        amount = Decimal(self.source_amount)
+        if amount != amount.quantize(Decimal(1).scaleb(-decimals)):
+            raise ValueError(
+                f"{self.source_currency} amounts allow at most {decimals} decimal places"
+            )
+        return self
+
+
+class QuoteResponse(BaseModel):
+    quote_id: str
+    source_currency: str
+    target_currency: str
+    source_amount: str
+    target_amount: str
+    fx_rate: str
+    margin: str
+    expires_at: datetime
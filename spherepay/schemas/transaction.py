@@ -1,30 +1,12 @@
-from pydantic import BaseModel, field_validator
-from decimal import Decimal
+from pydantic import BaseModel
 from datetime import datetime
 from typing import Optional
 from ..models.transaction import TransactionStatus
+from .quote import QuoteRequest
 
 
-class TransactionRequest(BaseModel):
-    source_currency: str
-    target_currency: str
-    source_amount: str  # String to handle decimal precision
-
-    @field_validator('source_currency', 'target_currency')
-    def validate_currency(cls, v):
-        if v not in {'USD', 'EUR', 'JPY', 'GBP', 'AUD'}:
-            raise ValueError(f"Unsupported currency: {v}")
-        return v
-
-    @field_validator('source_amount')
-    def validate_amount(cls, v):
-        try:
-            amount = Decimal(v)
-            if amount <= 0:
-                raise ValueError("Amount must be positive")
-            return v
-        except Exception as e:
-            raise ValueError(f"Invalid amount format: {str(e)}")
+class TransactionRequest(QuoteRequest):
+    quote_id: Optional[str] = None  # Honor a locked rate from POST /quote
 
 
 class TransactionResponse(BaseModel):
@@ -37,4 +19,19 @@ class TransactionResponse(BaseModel):
     margin: str
     status: TransactionStatus
     created_at: datetime
-    settled_at: Optional[datetime] = None 
\ No newline at end of file
+    settled_at: Optional[datetime] = None
+
+    @classmethod
+    def from_transaction(cls, transaction) -> "TransactionResponse":
+        return cls(
+            id=transaction.id,
+            source_currency=transaction.source_currency,
+            target_currency=transaction.target_currency,
+            source_amount=str(transaction.source_amount),
+            target_amount=str(transaction.target_amount),
+            fx_rate=str(transaction.fx_rate),
+            margin=str(transaction.margin),
+            status=transaction.status,
+            created_at=transaction.created_at,
+            settled_at=transaction.settled_at
+        )
\ No newline at end of file
@@ -1,16 +1,15 @@
 from decimal import Decimal
-from sqlalchemy.orm import Session
 from fastapi import HTTPException
-from datetime import datetime, UTC
 
 from ..models.fx_rate import FxRate
 from ..schemas.fx_rate import FxRateUpdate
+from ..storage import Storage
 from ..logger import logger
 
 
 class FxRateService:
-    def __init__(self, db: Session):
-        self.db = db
+    def __init__(self, storage: Storage):
+        self.storage = storage
 
     def create_rate(self, rate_update: FxRateUpdate) -> FxRate:
         try:
@@ -19,23 +18,20 @@ class FxRateService:
                 rate=Decimal(rate_update.rate),
                 timestamp=rate_update.timestamp
             )
-            self.db.add(fx_rate)
-            self.db.commit()
+            self.storage.add_rate(fx_rate)
+            self.storage.commit()
             logger.info(f"Created new FX rate: {rate_update.pair} = {rate_update.rate}")
             return fx_rate
 
         except Exception as e:
             logger.error(f"Error creating FX rate: {str(e)}")
-            self.db.rollback()
+            self.storage.rollback()
             raise
 
     def get_latest_rate(self, base: str, quote: str) -> FxRate:
         try:
             pair = f"{base}/{quote}"
-            rate = self.db.query(FxRate)\
-                .filter(FxRate.currency_pair == pair)\
-                .order_by(FxRate.timestamp.desc())\
-                .first()
+            rate = self.storage.get_latest_rate(pair)
             
             if not rate:
                 logger.error(f"No FX rate found for pair: {pair}")
@@ -44,7 +40,7 @@ class FxRateService:
                     detail=f"No rate available for {pair}"
                 )
                 
-            if (datetime.now(UTC) - rate.timestamp).seconds > 300:  # 5 minutes
+            if (self.storage.now() - rate.timestamp).seconds > 300:  # 5 minutes
                 logger.warning(f"FX rate for {pair} is stale: {rate.timestamp}")
                 
             return rate
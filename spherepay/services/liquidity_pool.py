@@ -1,68 +1,78 @@
 from decimal import Decimal
-from sqlalchemy.orm import Session
 from fastapi import HTTPException
-from sqlalchemy import func
-from datetime import datetime, UTC, timedelta
+from datetime import timedelta
+from typing import Optional
 
 from .. import config
 from ..logger import logger
-from ..models.liquidity_pool import LiquidityPool
-from ..models.transaction import Transaction
+from ..money import Money, Rate, ratio, to_decimals
 from ..services.fx_rate import FxRateService
+from ..storage import Storage
 
 
 class LiquidityPoolService:
-    def __init__(self, db: Session):
-        self.db = db
+    def __init__(self, storage: Storage):
+        self.storage = storage
 
-    def reserve_funds(self, currency: str, amount: Decimal):
+    def reserve_funds(self, currency: str, amount: Money):
         """Reserve funds for a pending transaction"""
         try:
-            pool = self.db.query(LiquidityPool)\
-                .filter(LiquidityPool.currency == currency)\
-                .first()
+            pool = self.storage.lock_pools(currency)[currency]
             
             if not pool:
                 logger.error(f"No liquidity pool found for {currency}")
                 raise HTTPException(status_code=400, detail=f"No liquidity pool for {currency}")
             
-            available = pool.balance - pool.reserved_balance
+            balance, reserved = Money.from_decimals((pool.balance, pool.reserved_balance), currency)
+            available = balance - reserved
             if available < amount:
                 logger.error(f"Insufficient liquidity in {currency}. Required: {amount}, Available: {available}")
                 raise HTTPException(status_code=400, detail=f"Insufficient liquidity in {currency}")
             
-            pool.reserved_balance += amount
-            self.db.commit()
+            reserved += amount
+            pool.reserved_balance = reserved.to_decimal()
+            self.storage.notify_pool_delta(-amount, balance)
+            self.storage.commit()
             logger.info(f"Reserved {amount} {currency}")
             
         except Exception as e:
             logger.error(f"Error reserving funds: {str(e)}")
-            self.db.rollback()
+            self.storage.rollback()
             raise
 
     def settle_transaction(self, source_currency: str, target_currency: str, 
-                         source_amount: Decimal, target_amount: Decimal):
+                         source_amount: Money, target_amount: Money):
         """Update balances after transaction settlement"""
         try:
-            source_pool = self.db.query(LiquidityPool)\
-                .filter(LiquidityPool.currency == source_currency)\
-                .first()
-            target_pool = self.db.query(LiquidityPool)\
-                .filter(LiquidityPool.currency == target_currency)\
-                .first()
+            pools = self.storage.lock_pools(source_currency, target_currency)
+            source_pool = pools[source_currency]
+            target_pool = pools[target_currency]
             
             if not source_pool or not target_pool:
                 logger.error("Invalid currency pools")
                 raise HTTPException(status_code=400, detail="Invalid currency pools")
             
+            source_balance, source_reserved = Money.from_decimals(
+                (source_pool.balance, source_pool.reserved_balance), source_currency
+            )
+            target_balance, target_reserved = Money.from_decimals(
+                (target_pool.balance, target_pool.reserved_balance), target_currency
+            )
+
             # Release reserved amount and deduct from target pool
-            target_pool.reserved_balance -= target_amount
-            target_pool.balance -= target_amount
+            target_reserved -= target_amount
+            target_balance -= target_amount
             
             # Add to source pool
-            source_pool.balance += source_amount
+            source_balance += source_amount
+
+            target_pool.reserved_balance, target_pool.balance, source_pool.balance = to_decimals(
+                (target_reserved, target_balance, source_balance)
+            )
+            # Target outflow was already signalled at reservation time
+            self.storage.notify_pool_delta(source_amount, source_balance)
             
-            self.db.commit()
+            self.storage.commit()
             logger.info(
                 f"Settled transaction: {source_amount} {source_currency} -> "
                 f"{target_amount} {target_currency}"
@@ -70,67 +80,63 @@ class LiquidityPoolService:
             
         except Exception as e:
             logger.error(f"Error settling transaction: {str(e)}")
-            self.db.rollback()
+            self.storage.rollback()
             raise
 
-    def get_pool_metrics(self, currency: str, hours: int = config.METRICS_WINDOW_HOURS) -> dict:
+    def get_pool_metrics(self, currency: str, hours: Optional[int] = None) -> dict:
         """Analyze pool's transaction patterns"""
-        since = datetime.now(UTC) - timedelta(hours=hours)
+        hours = hours or config.METRICS_WINDOW_HOURS
+        since = self.storage.now() - timedelta(hours=hours)
         
         # Get transaction volumes
-        outgoing = self.db.query(func.sum(Transaction.target_amount))\
-            .filter(Transaction.target_currency == currency)\
-            .filter(Transaction.created_at >= since)\
-            .scalar() or Decimal('0')
-            
-        incoming = self.db.query(func.sum(Transaction.source_amount))\
-            .filter(Transaction.source_currency == currency)\
-            .filter(Transaction.created_at >= since)\
-            .scalar() or Decimal('0')
+        outgoing, incoming = Money.from_decimals(
+            self.storage.get_flow_volumes(currency, since), currency
+        )
             
         # Get current pool state
-        pool = self.db.query(LiquidityPool)\
-            .filter(LiquidityPool.currency == currency)\
-            .first()
+        pool = self.storage.get_pool(currency)
+        balance = Money.from_decimal(pool.balance, currency)
             
         return {
             'currency': currency,
-            'current_balance': pool.balance,
+            'current_balance': balance,
             'outgoing_volume': outgoing,
             'incoming_volume': incoming,
             'net_flow': incoming - outgoing,
-            'utilization_rate': outgoing / pool.balance if pool.balance > 0 else Decimal('0')
+            'utilization_rate': ratio(outgoing, balance) if balance.units > 0 else Decimal('0')
         }
 
-    def internal_rebalance(self, from_currency: str, to_currency: str, amount: Decimal):
+    def internal_rebalance(self, from_currency: str, to_currency: str, amount: Money):
         """Execute internal bank transfer between pools"""
         try:
-            from_pool = self.db.query(LiquidityPool)\
-                .filter(LiquidityPool.currency == from_currency)\
-                .first()
-            to_pool = self.db.query(LiquidityPool)\
-                .filter(LiquidityPool.currency == to_currency)\
-                .first()
+            pools = self.storage.lock_pools(from_currency, to_currency)
+            from_pool = pools[from_currency]
+            to_pool = pools[to_currency]
 
             if not from_pool or not to_pool:
                 logger.error(f"Invalid currency pools: {from_currency}, {to_currency}")
                 raise ValueError("Invalid currency pools")
 
+            from_balance = Money.from_decimal(from_pool.balance, from_currency)
+            to_balance = Money.from_decimal(to_pool.balance, to_currency)
+
             # Check if source pool has sufficient balance
-            if from_pool.balance < amount:
+            if from_balance < amount:
                 logger.warning(f"Insufficient balance in {from_currency} pool for rebalance")
+                # Release the pool locks
+                self.storage.rollback()
                 return
 
             # Get current FX rate
-            fx_rate_service = FxRateService(self.db)
+            fx_rate_service = FxRateService(self.storage)
             rate = fx_rate_service.get_latest_rate(from_currency, to_currency)
-            converted_amount = amount * Decimal(str(rate.rate))
+            converted_amount = amount.convert(Rate.from_decimal(rate.rate), to_currency).round()
 
             # Direct balance updates
-            from_pool.balance -= amount
-            to_pool.balance += converted_amount
+            from_pool.balance = (from_balance - amount).to_decimal()
+            to_pool.balance = (to_balance + converted_amount).to_decimal()
             
-            self.db.commit()
+            self.storage.commit()
             logger.info(
                 f"Internal rebalance: {amount} {from_currency} -> "
                 f"{converted_amount} {to_currency}"
@@ -138,18 +144,18 @@ class LiquidityPoolService:
             
         except Exception as e:
             logger.error(f"Error during internal rebalance: {str(e)}")
-            self.db.rollback()
+            self.storage.rollback()
             raise
 
-    def rebalance_pools(self):
-        """Analyze and rebalance all pools"""
-        pools = self.db.query(LiquidityPool).all()
+    def rebalance_pools(self) -> dict:
+        """Analyze and rebalance all pools; returns the metrics it acted on"""
+        pools = self.storage.get_pools()
         metrics = {p.currency: self.get_pool_metrics(p.currency) for p in pools}
-        fx_service = FxRateService(self.db)
+        fx_service = FxRateService(self.storage)
         
         for currency, metric in metrics.items():
             if (metric['utilization_rate'] > config.REBALANCE_HIGH_UTILIZATION or 
-                metric['net_flow'] < 0):
+                metric['net_flow'].units < 0):
                 for other_currency, other_metric in metrics.items():
                     if (other_currency != currency and 
                         other_metric['utilization_rate'] < config.REBALANCE_LOW_UTILIZATION):
@@ -158,18 +164,19 @@ class LiquidityPoolService:
                         
                         # Convert to source currency
                         rate = fx_service.get_latest_rate(currency, other_currency)
-                        source_required = target_required * Decimal(str(rate.rate))
+                        source_required = target_required.convert(Rate.from_decimal(rate.rate), other_currency)
                         
-                        source_pool = self.db.query(LiquidityPool)\
-                            .filter(LiquidityPool.currency == other_currency)\
-                            .first()
+                        source_pool = self.storage.get_pool(other_currency)
+                        source_balance = Money.from_decimal(source_pool.balance, other_currency)
                         
                         # Don't transfer more than 50% of source pool
                         transfer_amount = min(
                             source_required,
-                            source_pool.balance * Decimal('0.5')
-                        )
+                            source_balance * Decimal('0.5')
+                        ).round()
                         
-                        if transfer_amount > 0:
+                        if transfer_amount.units > 0:
                             self.internal_rebalance(other_currency, currency, transfer_amount)
-                        break
\ No newline at end of file
+                        break
+
+        return metrics
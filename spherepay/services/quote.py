@@ -0,0 +1,115 @@
+from fastapi import HTTPException
+from datetime import datetime, UTC, timedelta
+import base64
+import hashlib
+import hmac
+import json
+
+from .. import config
+from .fx_rate import FxRateService
+from ..cache import LocalCacheBackend
+from ..schemas.quote import QuoteRequest, QuoteResponse
+from ..logger import logger
+from ..money import MAX_UNITS, Money, Rate
+from ..storage import Storage
+
+
+# Quotes are self-contained signed tokens; the store only saves re-verification.
+# Single use is enforced by the unique transactions.quote_id column.
+quote_store = LocalCacheBackend(max_entries=config.QUOTE_STORE_MAX_ENTRIES)
+
+
+def apply_margin(source_amount: Money, rate: Rate, target_currency: str) -> tuple[Money, Money]:
+    """Return the target amount after margin, rounded to the target currency, and the margin amount"""
+    base_target_amount = source_amount.convert(rate, target_currency)
+    if base_target_amount.units >= MAX_UNITS:
+        raise HTTPException(status_code=400, detail=f"Converted amount is too large for {target_currency}")
+    margin_amount = base_target_amount * config.TRANSACTION_MARGIN_RATE
+    # Round the payout down so revenue never falls below the margin
+    target_amount = (base_target_amount - margin_amount).round_down()
+    return target_amount, base_target_amount - target_amount
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
+
+
+def _b64decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+
+def _sign(payload: bytes) -> bytes:
+    return hmac.new(config.QUOTE_SIGNING_KEY.encode(), payload, hashlib.sha256).digest()
+
+
+class QuoteService:
+    def __init__(self, storage: Storage):
+        self.storage = storage
+
+    def create_quote(self, request: QuoteRequest) -> QuoteResponse:
+        fx_rate_service = FxRateService(self.storage)
+        fx_rate = fx_rate_service.get_latest_rate(
+            request.source_currency,
+            request.target_currency
+        )
+
+        rate = Rate.from_decimal(fx_rate.rate)
+        expires_at = self.storage.now() + timedelta(seconds=config.QUOTE_TTL_SECONDS)
+        payload = json.dumps({
+            "source_currency": request.source_currency,
+            "target_currency": request.target_currency,
+            "source_amount": request.source_amount,
+            "fx_rate": str(rate),
+            "expires_at": int(expires_at.timestamp())
+        }, separators=(",", ":")).encode()
+        quote_id = f"{_b64encode(payload)}.{_b64encode(_sign(payload))}"
+
+        quote = self._build_quote(quote_id, json.loads(payload))
+        quote_store.set(quote_id, quote, config.QUOTE_TTL_SECONDS)
+        logger.info(
+            f"Issued quote: {request.source_amount} {request.source_currency} -> "
+            f"{quote.target_amount} {request.target_currency} @ {rate}"
+        )
+        return quote
+
+    def get_quote(self, quote_id: str) -> QuoteResponse:
+        """Return a valid, unexpired quote or raise"""
+        quote = quote_store.get(quote_id)
+        if quote is None:
+            quote = self._verify(quote_id)
+
+        if quote.expires_at <= self.storage.now():
+            logger.warning(f"Quote expired at {quote.expires_at}")
+            raise HTTPException(status_code=400, detail="Quote has expired")
+        return quote
+
+    def _verify(self, quote_id: str) -> QuoteResponse:
+        # Quotes issued by another worker or before a restart are not in the store
+        try:
+            encoded_payload, encoded_signature = quote_id.split(".")
+            payload = _b64decode(encoded_payload)
+            signature = _b64decode(encoded_signature)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid quote")
+
+        if not hmac.compare_digest(signature, _sign(payload)):
+            logger.error("Quote signature mismatch")
+            raise HTTPException(status_code=400, detail="Invalid quote")
+
+        return self._build_quote(quote_id, json.loads(payload))
+
+    @staticmethod
+    def _build_quote(quote_id: str, data: dict) -> QuoteResponse:
+        rate = Rate.from_decimal(data["fx_rate"])
+        source_amount = Money.from_decimal(data["source_amount"], data["source_currency"])
+        target_amount, _ = apply_margin(source_amount, rate, data["target_currency"])
+        return QuoteResponse(
+            quote_id=quote_id,
+            source_currency=data["source_currency"],
+            target_currency=data["target_currency"],
+            source_amount=data["source_amount"],
+            target_amount=str(target_amount),
+            fx_rate=str(rate),
+            margin=str(config.TRANSACTION_MARGIN_RATE),
+            expires_at=datetime.fromtimestamp(data["expires_at"], UTC)
+        )
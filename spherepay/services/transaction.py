@@ -1,72 +1,98 @@
-from decimal import Decimal
-from sqlalchemy.orm import Session
 from fastapi import HTTPException, BackgroundTasks
-from datetime import datetime, UTC
 import asyncio
 
 from .. import config
+from ..admission import settlement_connections, settlement_limiter
+from ..cache import transaction_cache
 from .fx_rate import FxRateService
 from .liquidity_pool import LiquidityPoolService
-from ..database import SessionLocal
+from .quote import QuoteService, apply_margin
 from ..models.transaction import Transaction, TransactionStatus
-from ..schemas.transaction import TransactionRequest
+from ..schemas.transaction import TransactionRequest, TransactionResponse
 from ..logger import logger
+from ..money import Money, Rate
+from ..storage import Storage, open_storage
 
 
 class TransactionService:
-    def __init__(self, db: Session):
-        self.db = db
+    def __init__(self, storage: Storage):
+        self.storage = storage
 
     async def process_settlement(self, transaction_id: int):
-        db = SessionLocal()
+        storage = open_storage()
         try:
-            transaction = db.query(Transaction).filter(Transaction.id == transaction_id).first()
-            if not transaction:
-                logger.error(f"Transaction {transaction_id} not found")
-                return
-                
-            logger.info(f"Processing settlement for transaction {transaction_id}")
-            
-            # Reserve funds
-            try:
-                liquidity_service = LiquidityPoolService(db)
-                liquidity_service.reserve_funds(
-                    transaction.target_currency, 
-                    transaction.target_amount
+            async with settlement_connections:
+                transaction = storage.get_transaction(transaction_id)
+                if not transaction:
+                    logger.error(f"Transaction {transaction_id} not found")
+                    return
+                    
+                logger.info(f"Processing settlement for transaction {transaction_id}")
+                if not self.reserve_settlement(storage, transaction):
+                    return
+
+                settlement_delay = (
+                    config.SETTLEMENT_TIMES[transaction.source_currency] +
+                    config.SETTLEMENT_TIMES[transaction.target_currency]
                 )
-                transaction.status = TransactionStatus.PROCESSING
-                db.commit()
-                logger.info(f"Reserved funds for transaction {transaction_id}")
-            except HTTPException as e:
-                logger.error(f"Failed to reserve funds: {str(e)}")
-                transaction.status = TransactionStatus.FAILED
-                db.commit()
-                return
+                # Reading expired attributes reopened a transaction; don't hold
+                # its pooled connection through the delay
+                storage.commit()
                 
             # Settlement
             logger.info(f"Starting settlement delay for transaction {transaction_id}")
-            await asyncio.sleep(config.SETTLEMENT_TIMES[transaction.source_currency])
-            await asyncio.sleep(config.SETTLEMENT_TIMES[transaction.target_currency])
-            
-            try:
-                liquidity_service.settle_transaction(
-                    transaction.source_currency,
-                    transaction.target_currency,
-                    transaction.source_amount,
-                    transaction.target_amount
-                )
-                transaction.status = TransactionStatus.COMPLETED
-                transaction.settled_at = datetime.now(UTC)
-                db.commit()
-                logger.info(f"Settlement completed for transaction {transaction_id}")
-            except Exception as e:
-                logger.error(f"Settlement failed: {str(e)}")
-                transaction.status = TransactionStatus.FAILED
-                db.commit()
-                raise
+            await asyncio.sleep(settlement_delay)
+
+            async with settlement_connections:
+                self.complete_settlement(storage, transaction)
                 
         finally:
-            db.close()
+            storage.close()
+            settlement_limiter.finish(transaction_id)
+
+    @staticmethod
+    def reserve_settlement(storage: Storage, transaction: Transaction) -> bool:
+        """Reserve target funds; returns False if the transaction failed"""
+        try:
+            liquidity_service = LiquidityPoolService(storage)
+            liquidity_service.reserve_funds(
+                transaction.target_currency, 
+                Money.from_decimal(transaction.target_amount, transaction.target_currency)
+            )
+            transaction.status = TransactionStatus.PROCESSING
+            storage.commit()
+            transaction_cache.invalidate(transaction.id)
+            logger.info(f"Reserved funds for transaction {transaction.id}")
+            return True
+        except HTTPException as e:
+            logger.error(f"Failed to reserve funds: {str(e)}")
+            transaction.status = TransactionStatus.FAILED
+            storage.commit()
+            transaction_cache.invalidate(transaction.id)
+            return False
+
+    @staticmethod
+    def complete_settlement(storage: Storage, transaction: Transaction):
+        """Move reserved funds between pools once the settlement delay has passed"""
+        try:
+            liquidity_service = LiquidityPoolService(storage)
+            liquidity_service.settle_transaction(
+                transaction.source_currency,
+                transaction.target_currency,
+                Money.from_decimal(transaction.source_amount, transaction.source_currency),
+                Money.from_decimal(transaction.target_amount, transaction.target_currency)
+            )
+            transaction.status = TransactionStatus.COMPLETED
+            transaction.settled_at = storage.now()
+            storage.commit()
+            transaction_cache.invalidate(transaction.id)
+            logger.info(f"Settlement completed for transaction {transaction.id}")
+        except Exception as e:
+            logger.error(f"Settlement failed: {str(e)}")
+            transaction.status = TransactionStatus.FAILED
+            storage.commit()
+            transaction_cache.invalidate(transaction.id)
+            raise
 
     def create_transaction(self, request: TransactionRequest, background_tasks: BackgroundTasks) -> Transaction:
         try:
@@ -75,35 +101,41 @@ class TransactionService:
                 f"Amount: {request.source_amount}"
             )
             
-            # Use local instance of FxRateService
-            fx_rate_service = FxRateService(self.db)
-            fx_rate = fx_rate_service.get_latest_rate(
-                request.source_currency, 
-                request.target_currency
-            )
-            
-            source_amount = Decimal(request.source_amount)
+            source_amount = Money.from_decimal(request.source_amount, request.source_currency)
+
+            if request.quote_id:
+                # Honor the locked rate without looking up the latest one
+                rate = self._get_quoted_rate(request, source_amount)
+            else:
+                # Use local instance of FxRateService
+                fx_rate_service = FxRateService(self.storage)
+                fx_rate = fx_rate_service.get_latest_rate(
+                    request.source_currency, 
+                    request.target_currency
+                )
+                rate = Rate.from_decimal(fx_rate.rate)
 
             # Calculate target amount with margin
-            base_target_amount = source_amount * Decimal(str(fx_rate.rate))
             margin = config.TRANSACTION_MARGIN_RATE
-            margin_amount = base_target_amount * margin
-            final_target_amount = base_target_amount - margin_amount
+            final_target_amount, margin_amount = apply_margin(
+                source_amount, rate, request.target_currency
+            )
 
             # Create transaction
             transaction = Transaction(
                 source_currency=request.source_currency,
                 target_currency=request.target_currency,
-                source_amount=source_amount,
-                target_amount=final_target_amount,
-                fx_rate=fx_rate.rate,
+                source_amount=source_amount.to_decimal(),
+                target_amount=final_target_amount.to_decimal(),
+                fx_rate=rate.to_decimal(),
                 margin=margin,
-                revenue=margin_amount,
-                status=TransactionStatus.PENDING
+                revenue=margin_amount.to_decimal(),
+                status=TransactionStatus.PENDING,
+                quote_id=request.quote_id
             )
             
-            self.db.add(transaction)
-            self.db.commit()
+            self.storage.add_transaction(transaction)
+            self.storage.commit()
 
             logger.info(f"Created transaction {transaction.id}")
 
@@ -114,11 +146,30 @@ class TransactionService:
             
         except Exception as e:
             logger.error(f"Failed to create transaction: {str(e)}")
-            self.db.rollback()
+            self.storage.rollback()
             raise HTTPException(status_code=400, detail=str(e))
 
+    def _get_quoted_rate(self, request: TransactionRequest, source_amount: Money) -> Rate:
+        quote = QuoteService(self.storage).get_quote(request.quote_id)
+        if (quote.source_currency != request.source_currency or
+            quote.target_currency != request.target_currency or
+            Money.from_decimal(quote.source_amount, quote.source_currency) != source_amount):
+            logger.error("Transfer request does not match quote")
+            raise HTTPException(status_code=400, detail="Transfer does not match quote")
+        return Rate.from_decimal(quote.fx_rate)
+
     def get_transaction(self, transaction_id: int) -> Transaction:
-        transaction = self.db.query(Transaction).filter(Transaction.id == transaction_id).first()
+        transaction = self.storage.get_transaction(transaction_id)
         if not transaction:
             raise HTTPException(status_code=404, detail="Transaction not found")
-        return transaction
\ No newline at end of file
+        return transaction
+
+    def get_transaction_response(self, transaction_id: int) -> TransactionResponse:
+        """Read-through lookup of a transaction's serialized response"""
+        response = transaction_cache.get(transaction_id)
+        if response is not None:
+            return response
+
+        response = TransactionResponse.from_transaction(self.get_transaction(transaction_id))
+        transaction_cache.put(response)
+        return response
\ No newline at end of file
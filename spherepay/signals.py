@@ -0,0 +1,123 @@
+from decimal import Decimal
+from typing import Optional
+import asyncio
+import threading
+
+from . import config
+from .logger import logger
+from .money import Money, ratio
+
+# Postgres channel carrying pool deltas from every worker to the rebalancer
+POOL_SIGNAL_CHANNEL = "spherepay_pool_deltas"
+
+
+def encode_delta(delta: Money, balance: Money) -> str:
+    return f"{delta.currency}:{delta.units}:{balance.units}"
+
+
+def decode_delta(payload: str) -> tuple[Money, Money]:
+    currency, delta, balance = payload.split(":")
+    return Money(int(delta), currency), Money(int(balance), currency)
+
+
+class PoolSignal:
+    """Signal carrying pool-level liquidity deltas to the rebalancer.
+
+    Reservation and settlement publish changes in available liquidity; with
+    SqlStorage they travel over POOL_SIGNAL_CHANNEL so the leader sees the
+    deltas of every worker. The rebalancer is woken when a pool's outgoing
+    volume over the metrics window, as measured by rebalance_pools, crosses
+    REBALANCE_HIGH_UTILIZATION of its balance, or when its net outflow since
+    the last rebalance exceeds REBALANCE_OUTFLOW_TRIGGER_RATIO of its balance.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._baseline = {}
+        self._utilization = {}
+        self._outflow = {}
+        self._net_flow = {}
+        self._triggered = set()
+        self._event = asyncio.Event()
+        self._loop = None
+
+    def publish(self, delta: Money, balance: Money):
+        """Record a change in a pool's available liquidity (negative is outflow)"""
+        currency = delta.currency
+        with self._lock:
+            outflow = self._outflow.get(currency, 0) + max(0, -delta.units)
+            net_flow = self._net_flow.get(currency, 0) + delta.units
+            self._outflow[currency] = outflow
+            self._net_flow[currency] = net_flow
+
+            windowed_outflow = Money(self._baseline.get(currency, 0) + outflow, currency)
+            utilization = ratio(windowed_outflow, balance) if balance.units > 0 else Decimal('1')
+            previous = self._utilization.get(currency, Decimal('0'))
+            self._utilization[currency] = utilization
+
+            reason = None
+            if previous <= config.REBALANCE_HIGH_UTILIZATION < utilization:
+                reason = f"utilization {utilization:.2%}"
+            elif -net_flow > (balance * config.REBALANCE_OUTFLOW_TRIGGER_RATIO).units:
+                reason = f"net outflow {Money(-net_flow, currency)}"
+
+            if reason is None or currency in self._triggered:
+                return
+            self._triggered.add(currency)
+
+        logger.info(f"Rebalance triggered for {currency}: {reason}")
+        self._notify()
+
+    def receive(self, payload: str):
+        """Publish a delta sent by encode_delta, e.g. from another worker"""
+        try:
+            delta, balance = decode_delta(payload)
+        except ValueError:
+            logger.error(f"Ignoring malformed pool signal: {payload}")
+            return
+        self.publish(delta, balance)
+
+    def reset(self, metrics: Optional[dict] = None):
+        """Start a new window after a rebalance run.
+
+        metrics are the per-currency results of get_pool_metrics from that run;
+        their outgoing volume is the base that later outflows add to.
+        """
+        with self._lock:
+            self._baseline = {
+                currency: metric['outgoing_volume'].units
+                for currency, metric in (metrics or {}).items()
+            }
+            self._utilization = {
+                currency: metric['utilization_rate']
+                for currency, metric in (metrics or {}).items()
+            }
+            self._outflow.clear()
+            self._net_flow.clear()
+            self._triggered.clear()
+        self._event.clear()
+
+    async def wait(self, timeout: float) -> bool:
+        """Wait until triggered or timeout; returns whether it was triggered"""
+        self._loop = asyncio.get_running_loop()
+        try:
+            await asyncio.wait_for(self._event.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    @property
+    def triggered(self) -> bool:
+        return self._event.is_set()
+
+    def _notify(self):
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            # Nobody is waiting yet, or we are running without an event loop
+            self._event.set()
+            return
+        # Publishers may run off the event loop thread
+        loop.call_soon_threadsafe(self._event.set)
+
+
+pool_signal = PoolSignal()
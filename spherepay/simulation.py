@@ -0,0 +1,254 @@
+"""Offline simulation of transfers, FX ticks and rebalancing.
+
+Replays synthetic traffic through the services layer on MemoryStorage in
+accelerated time, so REBALANCE_* parameters can be tuned without Postgres:
+
+    python -m spherepay.simulation --transfers 1000000 --hours 24 \\
+        --set REBALANCE_HIGH_UTILIZATION=0.8 --bias EUR=3
+"""
+from contextlib import contextmanager
+from datetime import datetime, UTC, timedelta
+from decimal import Decimal
+from fastapi import BackgroundTasks, HTTPException
+import argparse
+import heapq
+import json
+import logging
+import math
+import random
+import time
+
+from . import config
+from .logger import logger
+from .models.fx_rate import FxRate
+from .models.transaction import TransactionStatus
+from .schemas.transaction import TransactionRequest
+from .services.liquidity_pool import LiquidityPoolService
+from .services.transaction import TransactionService
+from .signals import pool_signal
+from .storage import MemoryStorage
+
+FX_TICK = 0
+SETTLEMENT = 1
+TRANSFER = 2
+
+
+@contextmanager
+def override_config(overrides: dict):
+    """Temporarily replace config values, coercing to each setting's type"""
+    previous = {}
+    try:
+        for name, value in overrides.items():
+            if not hasattr(config, name):
+                raise ValueError(f"Unknown config setting: {name}")
+            previous[name] = getattr(config, name)
+            setattr(config, name, type(previous[name])(value))
+        yield
+    finally:
+        for name, value in previous.items():
+            setattr(config, name, value)
+
+
+class Simulation:
+    def __init__(self, transfers: int, hours: float, tick_seconds: float = 10,
+                 volatility: float = 0.0001, mean_amount: float = 1000,
+                 bias: dict = None, seed: int = 0):
+        self.transfers = transfers
+        self.duration = hours * 3600
+        self.tick_seconds = tick_seconds
+        self.volatility = volatility
+        self.mean_amount = mean_amount
+        self.random = random.Random(seed)
+        self.start = datetime(2024, 1, 1, tzinfo=UTC)
+
+        currencies = list(config.INITIAL_BALANCES)
+        bias = bias or {}
+        self.pairs = [(s, t) for s in currencies for t in currencies if s != t]
+        self.weights = [bias.get(t, 1) for _, t in self.pairs]
+        # USD value of one unit of each currency, implied by the initial pools
+        self.usd_values = {
+            c: config.INITIAL_BALANCES["USD"] / balance
+            for c, balance in config.INITIAL_BALANCES.items()
+        }
+
+        self.storage = MemoryStorage(clock=self.start, max_transactions=10_000)
+        self.stats = {
+            "transfers": 0,
+            "completed": 0,
+            "failed": 0,
+            "rebalance_runs": 0,
+            "rebalance_transfers": 0,
+            "min_available_ratio": {c: 1.0 for c in currencies}
+        }
+
+    def run(self) -> dict:
+        started = time.perf_counter()
+        events = []
+        sequence = 0
+
+        def schedule(offset, kind, payload=None):
+            nonlocal sequence
+            sequence += 1
+            heapq.heappush(events, (offset, sequence, kind, payload))
+
+        schedule(0, FX_TICK)
+        schedule(self.random.expovariate(self.transfers / self.duration), TRANSFER)
+        next_rebalance = 0.0
+        pool_signal.reset()
+
+        while events:
+            offset, _, kind, payload = heapq.heappop(events)
+            if kind == FX_TICK and offset > self.duration:
+                continue
+
+            while next_rebalance <= offset:
+                self.storage.clock = self.start + timedelta(seconds=next_rebalance)
+                self._rebalance()
+                next_rebalance += config.REBALANCE_MAX_INTERVAL_SECONDS
+
+            self.storage.clock = self.start + timedelta(seconds=offset)
+            if kind == FX_TICK:
+                self._tick()
+                schedule(offset + self.tick_seconds, FX_TICK)
+            elif kind == TRANSFER:
+                transaction = self._transfer()
+                if transaction is not None:
+                    settle_after = (
+                        config.SETTLEMENT_TIMES[transaction.source_currency] +
+                        config.SETTLEMENT_TIMES[transaction.target_currency]
+                    )
+                    schedule(offset + settle_after, SETTLEMENT, transaction)
+                if self.stats["transfers"] < self.transfers:
+                    schedule(offset + self.random.expovariate(self.transfers / self.duration), TRANSFER)
+            else:
+                self._settle(payload)
+
+            # Pools in trouble get a rebalance after the debounce delay
+            if pool_signal.triggered:
+                next_rebalance = min(next_rebalance, offset + config.REBALANCE_DEBOUNCE_SECONDS)
+
+        elapsed = time.perf_counter() - started
+        self.stats["balances"] = {
+            pool.currency: str(pool.balance) for pool in self.storage.get_pools()
+        }
+        self.stats["wall_seconds"] = round(elapsed, 2)
+        self.stats["speedup"] = round(self.duration / elapsed) if elapsed else None
+        return self.stats
+
+    def _tick(self):
+        for currency in self.usd_values:
+            if currency != "USD":
+                self.usd_values[currency] *= math.exp(
+                    self.volatility * math.sqrt(self.tick_seconds) * self.random.gauss(0, 1)
+                )
+
+        for source, target in self.pairs:
+            self.storage.add_rate(FxRate(
+                currency_pair=f"{source}/{target}",
+                rate=Decimal(f"{self.usd_values[source] / self.usd_values[target]:.6f}"),
+                timestamp=self.storage.now()
+            ))
+        self.storage.commit()
+
+    def _transfer(self):
+        self.stats["transfers"] += 1
+        source, target = self.random.choices(self.pairs, self.weights)[0]
+        usd_amount = self.random.lognormvariate(math.log(self.mean_amount), 1)
+        request = TransactionRequest(
+            source_currency=source,
+            target_currency=target,
+            source_amount=f"{usd_amount / self.usd_values[source]:.{config.CURRENCY_DECIMALS[source]}f}"
+        )
+
+        try:
+            service = TransactionService(self.storage)
+            transaction = service.create_transaction(request, BackgroundTasks())
+        except HTTPException:
+            self.stats["failed"] += 1
+            return None
+
+        if not TransactionService.reserve_settlement(self.storage, transaction):
+            self.stats["failed"] += 1
+            return None
+        return transaction
+
+    def _settle(self, transaction):
+        try:
+            TransactionService.complete_settlement(self.storage, transaction)
+        except Exception:
+            # The failure is recorded on the transaction status
+            pass
+
+        if transaction.status == TransactionStatus.COMPLETED:
+            self.stats["completed"] += 1
+        else:
+            self.stats["failed"] += 1
+
+    def _rebalance(self):
+        if not self.storage.rates:
+            return
+
+        before = {pool.currency: pool.balance for pool in self.storage.get_pools()}
+        metrics = {}
+        try:
+            metrics = LiquidityPoolService(self.storage).rebalance_pools()
+        except Exception as e:
+            logger.error(f"Error in simulated rebalancing: {str(e)}")
+            self.storage.rollback()
+        pool_signal.reset(metrics)
+
+        self.stats["rebalance_runs"] += 1
+        for pool in self.storage.get_pools():
+            if pool.balance > before[pool.currency]:
+                self.stats["rebalance_transfers"] += 1
+            available = float((pool.balance - pool.reserved_balance) / Decimal(config.INITIAL_BALANCES[pool.currency]))
+            ratios = self.stats["min_available_ratio"]
+            ratios[pool.currency] = round(min(ratios[pool.currency], available), 4)
+
+
+def _parse_assignments(values: list[str]) -> dict:
+    assignments = {}
+    for value in values:
+        name, _, setting = value.partition("=")
+        assignments[name] = setting
+    return assignments
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--transfers", type=int, default=100_000)
+    parser.add_argument("--hours", type=float, default=24)
+    parser.add_argument("--tick-seconds", type=float, default=10)
+    parser.add_argument("--volatility", type=float, default=0.0001)
+    parser.add_argument("--mean-amount", type=float, default=1000, help="Mean transfer size in USD")
+    parser.add_argument("--bias", action="append", default=[], metavar="CUR=WEIGHT",
+                        help="Weight transfers into a target currency")
+    parser.add_argument("--set", action="append", default=[], metavar="NAME=VALUE",
+                        help="Override a config setting, e.g. REBALANCE_HIGH_UTILIZATION=0.8")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    bias = {c: float(w) for c, w in _parse_assignments(args.bias).items()}
+    # Per-transfer service logging would dominate the run time
+    previous_level = logger.level
+    logger.setLevel(logging.CRITICAL)
+    try:
+        with override_config(_parse_assignments(args.set)):
+            simulation = Simulation(
+                transfers=args.transfers,
+                hours=args.hours,
+                tick_seconds=args.tick_seconds,
+                volatility=args.volatility,
+                mean_amount=args.mean_amount,
+                bias=bias,
+                seed=args.seed
+            )
+            stats = simulation.run()
+    finally:
+        logger.setLevel(previous_level)
+
+    print(json.dumps(stats, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,300 @@
+from collections import OrderedDict, defaultdict, deque
+from decimal import Decimal
+from datetime import datetime, UTC
+from typing import Optional
+from sqlalchemy import func, text
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from . import config
+from .database import SessionLocal
+from .models.fx_rate import FxRate
+from .models.liquidity_pool import LiquidityPool
+from .models.transaction import Transaction
+from .money import Money
+from .signals import POOL_SIGNAL_CHANNEL, encode_delta, pool_signal
+
+
+class QuoteAlreadyUsed(Exception):
+    """Raised on commit when a transaction redeems a quote that funded another"""
+
+    def __init__(self):
+        super().__init__("Quote has already been used")
+
+
+class Storage:
+    """Persistence used by the services layer.
+
+    Services stage changes by mutating the objects they get back and then
+    call commit() or rollback(), as they would with a SQLAlchemy session.
+    """
+
+    def now(self) -> datetime:
+        return datetime.now(UTC)
+
+    def get_pool(self, currency: str) -> Optional[LiquidityPool]:
+        raise NotImplementedError
+
+    def get_pools(self) -> list[LiquidityPool]:
+        raise NotImplementedError
+
+    def lock_pools(self, *currencies: str) -> dict[str, Optional[LiquidityPool]]:
+        """Fetch pools for a balance update, locked until commit or rollback"""
+        raise NotImplementedError
+
+    def add_rate(self, fx_rate: FxRate):
+        raise NotImplementedError
+
+    def get_latest_rate(self, currency_pair: str) -> Optional[FxRate]:
+        raise NotImplementedError
+
+    def add_transaction(self, transaction: Transaction):
+        raise NotImplementedError
+
+    def get_transaction(self, transaction_id: int) -> Optional[Transaction]:
+        raise NotImplementedError
+
+    def get_flow_volumes(self, currency: str, since: datetime) -> tuple[Decimal, Decimal]:
+        """Return (outgoing, incoming) transaction volume for a pool since a time"""
+        raise NotImplementedError
+
+    def notify_pool_delta(self, delta: Money, balance: Money):
+        """Send a pool delta to the rebalancer once the transaction commits"""
+        raise NotImplementedError
+
+    def commit(self):
+        raise NotImplementedError
+
+    def rollback(self):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class SqlStorage(Storage):
+    """Postgres storage backed by a SQLAlchemy session"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get_pool(self, currency: str) -> Optional[LiquidityPool]:
+        return self.db.query(LiquidityPool)\
+            .filter(LiquidityPool.currency == currency)\
+            .first()
+
+    def get_pools(self) -> list[LiquidityPool]:
+        return self.db.query(LiquidityPool).all()
+
+    def lock_pools(self, *currencies: str) -> dict[str, Optional[LiquidityPool]]:
+        # Lock rows in currency order so concurrent updates cannot deadlock,
+        # and refresh any copies already loaded into the session
+        pools = self.db.query(LiquidityPool)\
+            .filter(LiquidityPool.currency.in_(currencies))\
+            .order_by(LiquidityPool.currency)\
+            .with_for_update()\
+            .populate_existing()\
+            .all()
+        by_currency = {pool.currency: pool for pool in pools}
+        return {currency: by_currency.get(currency) for currency in currencies}
+
+    def add_rate(self, fx_rate: FxRate):
+        self.db.add(fx_rate)
+
+    def get_latest_rate(self, currency_pair: str) -> Optional[FxRate]:
+        return self.db.query(FxRate)\
+            .filter(FxRate.currency_pair == currency_pair)\
+            .order_by(FxRate.timestamp.desc())\
+            .first()
+
+    def add_transaction(self, transaction: Transaction):
+        self.db.add(transaction)
+
+    def get_transaction(self, transaction_id: int) -> Optional[Transaction]:
+        return self.db.query(Transaction).filter(Transaction.id == transaction_id).first()
+
+    def get_flow_volumes(self, currency: str, since: datetime) -> tuple[Decimal, Decimal]:
+        outgoing = self.db.query(func.sum(Transaction.target_amount))\
+            .filter(Transaction.target_currency == currency)\
+            .filter(Transaction.created_at >= since)\
+            .scalar() or Decimal('0')
+
+        incoming = self.db.query(func.sum(Transaction.source_amount))\
+            .filter(Transaction.source_currency == currency)\
+            .filter(Transaction.created_at >= since)\
+            .scalar() or Decimal('0')
+
+        return outgoing, incoming
+
+    def notify_pool_delta(self, delta: Money, balance: Money):
+        # Delivered to the leader's LISTEN on commit, dropped on rollback
+        self.db.execute(
+            text("SELECT pg_notify(:channel, :payload)"),
+            {"channel": POOL_SIGNAL_CHANNEL, "payload": encode_delta(delta, balance)}
+        )
+
+    def commit(self):
+        try:
+            self.db.commit()
+        except IntegrityError as e:
+            self.db.rollback()
+            if getattr(getattr(e.orig, "diag", None), "constraint_name", None) == "uq_transactions_quote_id":
+                raise QuoteAlreadyUsed() from e
+            raise
+
+    def rollback(self):
+        self.db.rollback()
+
+    def close(self):
+        self.db.close()
+
+
+class MemoryStorage(Storage):
+    """In-process storage with the same semantics as SqlStorage.
+
+    Meant for tests and simulation. The clock can be set to run in
+    accelerated time, only the latest rate per pair is kept, and flows older
+    than the most recently queried window are discarded. Pool balances and
+    added rows are restored on rollback.
+    """
+
+    def __init__(self, balances: dict = config.INITIAL_BALANCES, clock: Optional[datetime] = None,
+                 max_transactions: Optional[int] = None):
+        self.clock = clock
+        self.max_transactions = max_transactions
+        self.pools = {
+            currency: LiquidityPool(
+                currency=currency,
+                balance=Decimal(balance),
+                reserved_balance=Decimal('0')
+            )
+            for currency, balance in balances.items()
+        }
+        self.rates = {}
+        self.transactions = OrderedDict()
+        self._next_transaction_id = 1
+        self._quote_ids = set()
+        self._outgoing = defaultdict(deque)
+        self._incoming = defaultdict(deque)
+        self._volumes = defaultdict(lambda: [Decimal('0'), Decimal('0')])
+        self._pending_rates = []
+        self._pending_transactions = []
+        self._pending_pool_deltas = []
+        # Pool values as of the last commit, captured when a pool is handed out
+        self._pool_snapshot = {}
+
+    def now(self) -> datetime:
+        return self.clock or datetime.now(UTC)
+
+    def get_pool(self, currency: str) -> Optional[LiquidityPool]:
+        pool = self.pools.get(currency)
+        if pool is not None and currency not in self._pool_snapshot:
+            self._pool_snapshot[currency] = (pool.balance, pool.reserved_balance)
+        return pool
+
+    def get_pools(self) -> list[LiquidityPool]:
+        return [self.get_pool(currency) for currency in self.pools]
+
+    def lock_pools(self, *currencies: str) -> dict[str, Optional[LiquidityPool]]:
+        return {currency: self.get_pool(currency) for currency in currencies}
+
+    def add_rate(self, fx_rate: FxRate):
+        self._pending_rates.append(fx_rate)
+
+    def get_latest_rate(self, currency_pair: str) -> Optional[FxRate]:
+        return self.rates.get(currency_pair)
+
+    def add_transaction(self, transaction: Transaction):
+        self._pending_transactions.append(transaction)
+
+    def get_transaction(self, transaction_id: int) -> Optional[Transaction]:
+        return self.transactions.get(transaction_id)
+
+    def get_flow_volumes(self, currency: str, since: datetime) -> tuple[Decimal, Decimal]:
+        volumes = self._volumes[currency]
+        for index, flows in enumerate((self._outgoing[currency], self._incoming[currency])):
+            while flows and flows[0][0] < since:
+                volumes[index] -= flows.popleft()[1]
+        return volumes[0], volumes[1]
+
+    def notify_pool_delta(self, delta: Money, balance: Money):
+        self._pending_pool_deltas.append((delta, balance))
+
+    def commit(self):
+        quote_ids = [t.quote_id for t in self._pending_transactions if t.quote_id is not None]
+        if len(set(quote_ids)) < len(quote_ids) or self._quote_ids.intersection(quote_ids):
+            self.rollback()
+            raise QuoteAlreadyUsed()
+        self._quote_ids.update(quote_ids)
+
+        for fx_rate in self._pending_rates:
+            latest = self.rates.get(fx_rate.currency_pair)
+            if latest is None or latest.timestamp <= fx_rate.timestamp:
+                self.rates[fx_rate.currency_pair] = fx_rate
+
+        for transaction in self._pending_transactions:
+            if transaction.id is None:
+                transaction.id = self._next_transaction_id
+                self._next_transaction_id += 1
+            if transaction.created_at is None:
+                transaction.created_at = self.now()
+            self.transactions[transaction.id] = transaction
+            self._record_flows(transaction)
+
+        if self.max_transactions is not None:
+            while len(self.transactions) > self.max_transactions:
+                self.transactions.popitem(last=False)
+
+        pool_deltas = self._pending_pool_deltas
+        self._pending_rates.clear()
+        self._pending_transactions.clear()
+        self._pending_pool_deltas = []
+        self._pool_snapshot.clear()
+        # Everything runs in this process, so the signal is published directly
+        for delta, balance in pool_deltas:
+            pool_signal.publish(delta, balance)
+
+    def rollback(self):
+        for currency, (balance, reserved_balance) in self._pool_snapshot.items():
+            pool = self.pools[currency]
+            pool.balance = balance
+            pool.reserved_balance = reserved_balance
+        self._pending_rates.clear()
+        self._pending_transactions.clear()
+        self._pending_pool_deltas.clear()
+        self._pool_snapshot.clear()
+
+    def _record_flows(self, transaction: Transaction):
+        self._outgoing[transaction.target_currency].append(
+            (transaction.created_at, transaction.target_amount)
+        )
+        self._volumes[transaction.target_currency][0] += transaction.target_amount
+        self._incoming[transaction.source_currency].append(
+            (transaction.created_at, transaction.source_amount)
+        )
+        self._volumes[transaction.source_currency][1] += transaction.source_amount
+
+
+def _open_sql_storage() -> Storage:
+    return SqlStorage(SessionLocal())
+
+
+_storage_factory = _open_sql_storage
+
+
+def set_storage_factory(factory):
+    """Swap the backend used for requests and background work"""
+    global _storage_factory
+    _storage_factory = factory
+
+
+def open_storage() -> Storage:
+    return _storage_factory()
+
+
+def get_storage():
+    storage = open_storage()
+    try:
+        yield storage
+    finally:
+        storage.close()
@@ -1,26 +1,163 @@
 from fastapi import BackgroundTasks
+from sqlalchemy import text
 import asyncio
-from .database import SessionLocal
+from .database import engine
 from .services.liquidity_pool import LiquidityPoolService
 from . import config
+from .signals import POOL_SIGNAL_CHANNEL, pool_signal
+from .storage import open_storage
 import logging
 
 logger = logging.getLogger(__name__)
 
-async def rebalance_pools_task():
-    """Run pool rebalancing every hour"""
-    while True:
-        db = SessionLocal()
+
+class RebalancerLeadership:
+    """Elects a single rebalancer across workers with a Postgres advisory lock.
+
+    The lock is session-level and held on a dedicated connection, so if the
+    leader process dies its connection drops, the lock is released and another
+    worker takes over on its next attempt. The same connection listens for
+    pool signals from every worker.
+    """
+
+    def __init__(self, lock_id: int = config.REBALANCER_LOCK_ID):
+        self.lock_id = lock_id
+        self.connection = None
+
+    def ensure(self) -> bool:
+        """Acquire leadership or confirm it is still held"""
+        if self.connection is not None:
+            try:
+                self.connection.execute(text("SELECT 1"))
+                return True
+            except Exception as e:
+                logger.error(f"Lost rebalancer leadership: {str(e)}")
+                self._discard()
+                return False
+
+        connection = engine.connect().execution_options(isolation_level="AUTOCOMMIT")
         try:
-            logger.info("Starting scheduled rebalancing")
-            liquidity_service = LiquidityPoolService(db)
-            liquidity_service.rebalance_pools()
-            logger.info("Completed scheduled rebalancing")
+            acquired = connection.execute(
+                text("SELECT pg_try_advisory_lock(:lock_id)"),
+                {"lock_id": self.lock_id}
+            ).scalar()
+            if acquired:
+                connection.execute(text(f"LISTEN {POOL_SIGNAL_CHANNEL}"))
+        except Exception:
+            connection.invalidate()
+            connection.close()
+            raise
+
+        if not acquired:
+            connection.close()
+            return False
 
+        self.connection = connection
+        logger.info("Acquired rebalancer leadership")
+        return True
+
+    def poll_signals(self) -> list[str]:
+        """Drain pool signal payloads received since the last poll"""
+        if self.connection is None:
+            return []
+        try:
+            dbapi_connection = self.connection.connection.dbapi_connection
+            dbapi_connection.poll()
+            payloads = [notify.payload for notify in dbapi_connection.notifies]
+            dbapi_connection.notifies.clear()
+            return payloads
         except Exception as e:
-            logger.error(f"Error in rebalancing task: {str(e)}")
+            logger.error(f"Lost rebalancer leadership: {str(e)}")
+            self._discard()
+            return []
 
+    def release(self):
+        if self.connection is None:
+            return
+        try:
+            self.connection.execute(
+                text("SELECT pg_advisory_unlock(:lock_id)"),
+                {"lock_id": self.lock_id}
+            )
+            self.connection.close()
+            logger.info("Released rebalancer leadership")
+        except Exception as e:
+            logger.error(f"Error releasing rebalancer leadership: {str(e)}")
+            self._discard()
         finally:
-            db.close()
+            self.connection = None
+
+    def _discard(self):
+        # Never return a connection that may still hold the lock to the pool
+        try:
+            self.connection.invalidate()
+            self.connection.close()
+        except Exception:
+            pass
+        self.connection = None
+
+
+def run_rebalance() -> dict:
+    """Rebalance pools; returns the pool metrics, empty if the run failed"""
+    storage = open_storage()
+    try:
+        logger.info("Starting rebalancing")
+        liquidity_service = LiquidityPoolService(storage)
+        metrics = liquidity_service.rebalance_pools()
+        logger.info("Completed rebalancing")
+        return metrics
+
+    except Exception as e:
+        logger.error(f"Error in rebalancing task: {str(e)}")
+        return {}
+
+    finally:
+        storage.close()
+
+
+async def rebalance_pools_task():
+    """Run pool rebalancing on the elected leader worker"""
+    leadership = RebalancerLeadership()
+    in_flight = None
+
+    async def run_in_thread(func):
+        # Rebalancing and leadership use blocking DB calls; keep them off the
+        # event loop. Shielded so cancellation never abandons a thread that is
+        # still rebalancing or holding the leadership connection.
+        nonlocal in_flight
+        in_flight = asyncio.ensure_future(asyncio.to_thread(func))
+        return await asyncio.shield(in_flight)
+
+    try:
+        while True:
+            try:
+                is_leader = await run_in_thread(leadership.ensure)
+            except Exception as e:
+                logger.error(f"Error acquiring rebalancer leadership: {str(e)}")
+                is_leader = False
+
+            if not is_leader:
+                await asyncio.sleep(config.REBALANCER_LEADER_RETRY_SECONDS)
+                continue
+
+            metrics = await run_in_thread(run_rebalance)
+            pool_signal.reset(metrics)
+
+            # Run again when a pool signals trouble, or after the max interval
+            loop = asyncio.get_running_loop()
+            deadline = loop.time() + config.REBALANCE_MAX_INTERVAL_SECONDS
+            while leadership.connection is not None and loop.time() < deadline:
+                for payload in await run_in_thread(leadership.poll_signals):
+                    pool_signal.receive(payload)
+                if pool_signal.triggered:
+                    await asyncio.sleep(config.REBALANCE_DEBOUNCE_SECONDS)
+                    break
+                await pool_signal.wait(min(config.REBALANCE_SIGNAL_POLL_SECONDS, deadline - loop.time()))
 
-        await asyncio.sleep(config.REBALANCE_INTERVAL_SECONDS)
\ No newline at end of file
+    finally:
+        # Another worker must not take over while this one is still running
+        if in_flight is not None:
+            await asyncio.wait([in_flight])
+            if in_flight.exception() is not None:
+                logger.error(f"Error in rebalancer during shutdown: {str(in_flight.exception())}")
+        await asyncio.to_thread(leadership.release)
@@ -1,5 +1,23 @@
 #!/bin/bash
 
+# Usage: bash ./start.sh [dev|prod]
+MODE=${1:-dev}
+
+if [ "$MODE" = "prod" ]; then
+    # Multiple workers; a single elected worker runs the rebalancer.
+    # Workers must share a quote signing key to honor each other's quotes.
+    export QUOTE_SIGNING_KEY="${QUOTE_SIGNING_KEY:-$(openssl rand -hex 32)}"
+    if [ -z "$QUOTE_SIGNING_KEY" ]; then
+        echo "QUOTE_SIGNING_KEY is not set and could not be generated" >&2
+        exit 1
+    fi
+    echo "Starting FastAPI server with ${WEB_CONCURRENCY:-4} workers..."
+    exec poetry run uvicorn spherepay.main:app \
+        --host "${HOST:-0.0.0.0}" \
+        --port "${PORT:-8000}" \
+        --workers "${WEB_CONCURRENCY:-4}"
+fi
+
 # Start FastAPI in the background
 echo "Starting FastAPI server..."
 poetry run uvicorn spherepay.main:app --reload &
@@ -9,4 +27,4 @@ sleep 3
 
 # Start FX rates mock script
 echo "Starting FX rates mock..."
-node scripts/mock_fx_rates.js http://localhost:8000/fx-rate 
\ No newline at end of file
+node scripts/mock_fx_rates.js http://localhost:8000/fx-rate 
@@ -0,0 +1,26 @@
+from datetime import datetime, UTC
+from decimal import Decimal
+import pytest
+
+from spherepay.cache import LocalCacheBackend
+from spherepay.models.fx_rate import FxRate
+from spherepay.services import quote
+from spherepay.storage import MemoryStorage
+
+START = datetime(2024, 1, 1, tzinfo=UTC)
+
+
+@pytest.fixture
+def storage():
+    storage = MemoryStorage(clock=START)
+    storage.add_rate(FxRate(currency_pair="USD/EUR", rate=Decimal("0.9"), timestamp=START))
+    storage.add_rate(FxRate(currency_pair="USD/JPY", rate=Decimal("149.5"), timestamp=START))
+    storage.commit()
+    return storage
+
+
+@pytest.fixture(autouse=True)
+def quote_store(monkeypatch):
+    store = LocalCacheBackend(max_entries=100)
+    monkeypatch.setattr(quote, "quote_store", store)
+    return store
@@ -0,0 +1,87 @@
+from fastapi import HTTPException
+from starlette.requests import Request
+import asyncio
+import httpx
+import pytest
+
+from spherepay import admission, config, storage as storage_module
+from spherepay.api import transfers
+from spherepay.admission import ClientRateLimiter, SettlementLimiter, limit_client
+from spherepay.main import app
+from spherepay.models.transaction import TransactionStatus
+from spherepay.services import transaction as transaction_service
+
+TRANSFER = {"source_currency": "USD", "target_currency": "EUR", "source_amount": "100.00"}
+
+
+@pytest.fixture
+def transfer_app(storage, monkeypatch):
+    storage.clock = None
+    monkeypatch.setattr(storage_module, "_storage_factory", lambda: storage)
+    monkeypatch.setattr(config, "SETTLEMENT_TIMES", {c: 0.01 for c in config.SETTLEMENT_TIMES})
+    monkeypatch.setattr(admission, "client_rate_limiter", ClientRateLimiter(1000, 1000, 10))
+    limiter = SettlementLimiter(1000)
+    monkeypatch.setattr(transfers, "settlement_limiter", limiter)
+    monkeypatch.setattr(transaction_service, "settlement_limiter", limiter)
+    return storage
+
+
+async def _post_transfers(count: int) -> list[httpx.Response]:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        return await asyncio.gather(*(client.post("/transfer", json=TRANSFER) for _ in range(count)))
+
+
+def test_transfers_beyond_connection_limit_do_not_deadlock(transfer_app, monkeypatch):
+    limit = 2
+
+    async def run():
+        monkeypatch.setattr(admission, "transfer_connections", asyncio.Semaphore(limit))
+        monkeypatch.setattr(transaction_service, "settlement_connections", asyncio.Semaphore(1))
+        return await asyncio.wait_for(_post_transfers(limit * 3), timeout=10)
+
+    responses = asyncio.run(run())
+    assert [response.status_code for response in responses] == [200] * (limit * 3)
+    assert all(
+        transfer_app.get_transaction(response.json()["id"]).status == TransactionStatus.COMPLETED
+        for response in responses
+    )
+    assert transfers.settlement_limiter.in_flight == {"USD/EUR": 0}
+
+
+def test_settlement_slot_expires_if_never_finished(monkeypatch):
+    monkeypatch.setattr(config, "SETTLEMENT_TIMES", {c: 0 for c in config.SETTLEMENT_TIMES})
+    limiter = SettlementLimiter(1, grace_seconds=0)
+    limiter.track(1, limiter.acquire("USD", "EUR"))
+
+    limiter.track(2, limiter.acquire("USD", "EUR"))
+    limiter.finish(1)
+    assert limiter.in_flight == {"USD/EUR": 1}
+
+
+def test_settlement_slot_is_held_until_finished(monkeypatch):
+    limiter = SettlementLimiter(1, grace_seconds=60)
+    limiter.track(1, limiter.acquire("USD", "EUR"))
+
+    with pytest.raises(HTTPException) as error:
+        limiter.acquire("USD", "EUR")
+    assert error.value.status_code == 429
+
+    limiter.finish(1)
+    limiter.acquire("USD", "EUR")
+
+
+def test_rate_limit_ignores_client_id_header(monkeypatch):
+    monkeypatch.setattr(admission, "client_rate_limiter", ClientRateLimiter(0.001, 1, 10))
+
+    def request(client_id: str) -> Request:
+        return Request({
+            "type": "http",
+            "headers": [(b"x-client-id", client_id.encode())],
+            "client": ("203.0.113.7", 40000)
+        })
+
+    asyncio.run(limit_client(request("a")))
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(limit_client(request("b")))
+    assert error.value.status_code == 429
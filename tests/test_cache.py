@@ -0,0 +1,110 @@
+from datetime import datetime, UTC
+import pytest
+
+from spherepay import cache, config
+from spherepay.cache import CacheBackend, LocalCacheBackend, TransactionCache
+from spherepay.models.transaction import TransactionStatus
+from spherepay.schemas.transaction import TransactionResponse
+
+
+class RecordingBackend(CacheBackend):
+    def __init__(self):
+        self.entries = {}
+
+    def get(self, key):
+        return self.entries.get(key, (None, None))[0]
+
+    def set(self, key, value, ttl=None):
+        self.entries[key] = (value, ttl)
+
+    def delete(self, key):
+        self.entries.pop(key, None)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache.time, "monotonic", lambda: now[0])
+    return now
+
+
+def _response(status: TransactionStatus, transaction_id: int = 1) -> TransactionResponse:
+    return TransactionResponse(
+        id=transaction_id,
+        source_currency="USD",
+        target_currency="EUR",
+        source_amount="100",
+        target_amount="89.91",
+        fx_rate="0.9",
+        margin="0.001",
+        status=status,
+        created_at=datetime(2024, 1, 1, tzinfo=UTC)
+    )
+
+
+def test_local_backend_evicts_least_recently_used():
+    backend = LocalCacheBackend(max_entries=2)
+    backend.set("a", "1")
+    backend.set("b", "2")
+    assert backend.get("a") == "1"
+
+    backend.set("c", "3")
+
+    assert backend.get("b") is None
+    assert backend.get("a") == "1"
+    assert backend.get("c") == "3"
+
+
+def test_local_backend_expires_entries(clock):
+    backend = LocalCacheBackend(max_entries=10)
+    backend.set("short", "1", ttl=2)
+    backend.set("forever", "2")
+
+    clock[0] += 1.9
+    assert backend.get("short") == "1"
+    clock[0] += 0.1
+    assert backend.get("short") is None
+    assert backend.get("forever") == "2"
+
+
+def test_local_backend_delete():
+    backend = LocalCacheBackend(max_entries=10)
+    backend.set("a", "1")
+    backend.delete("a")
+    backend.delete("missing")
+    assert backend.get("a") is None
+
+
+@pytest.mark.parametrize("status, ttl", [
+    (TransactionStatus.PENDING, config.TRANSACTION_CACHE_TTL_SECONDS["pending"]),
+    (TransactionStatus.PROCESSING, config.TRANSACTION_CACHE_TTL_SECONDS["processing"]),
+    (TransactionStatus.COMPLETED, config.TRANSACTION_CACHE_SETTLED_TTL_SECONDS),
+    (TransactionStatus.FAILED, config.TRANSACTION_CACHE_SETTLED_TTL_SECONDS),
+])
+def test_put_uses_status_ttl(status, ttl):
+    backend = RecordingBackend()
+    TransactionCache(backend).put(_response(status))
+    assert [entry[1] for entry in backend.entries.values()] == [ttl]
+
+
+def test_put_skips_in_flight_status_without_ttl(monkeypatch):
+    monkeypatch.setattr(config, "TRANSACTION_CACHE_TTL_SECONDS", {"pending": 2})
+    backend = RecordingBackend()
+    TransactionCache(backend).put(_response(TransactionStatus.PROCESSING))
+    assert backend.entries == {}
+
+
+def test_get_round_trips_response():
+    transaction_cache = TransactionCache(RecordingBackend())
+    response = _response(TransactionStatus.COMPLETED)
+    transaction_cache.put(response)
+    assert transaction_cache.get(1) == response
+    assert transaction_cache.get(2) is None
+
+
+def test_get_discards_unreadable_payload():
+    backend = RecordingBackend()
+    backend.set(TransactionCache._key(1), '{"id": 1, "status": "settling"}')
+
+    assert TransactionCache(backend).get(1) is None
+    assert backend.entries == {}
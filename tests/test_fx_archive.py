@@ -0,0 +1,89 @@
+from array import array
+from datetime import datetime, UTC
+from decimal import Decimal
+import pytest
+
+from spherepay import fx_archive
+from spherepay.fx_archive import FxArchive, replay, write_archive
+from spherepay.storage import MemoryStorage
+
+START = int(datetime(2024, 1, 1, tzinfo=UTC).timestamp() * 1_000_000)
+TICKS = {
+    "USD/EUR": (array("q", [START, START + 20, START + 40]), array("q", [900_000, 901_000, 902_500])),
+    "USD/JPY": (array("q", [START + 10, START + 30]), array("q", [149_500_000, 149_612_345]))
+}
+
+
+@pytest.fixture
+def path(tmp_path):
+    path = str(tmp_path / "ticks.spfx")
+    write_archive(path, TICKS)
+    return path
+
+
+def test_round_trip(path):
+    with FxArchive(path) as archive:
+        assert archive.pairs == ["USD/EUR", "USD/JPY"]
+        assert archive.total == 5
+        assert archive.scale == 6
+        for pair, (timestamps, rates) in TICKS.items():
+            assert archive.timestamps(pair).tolist() == timestamps.tolist()
+            assert archive.rates(pair).tolist() == rates.tolist()
+
+
+def test_round_trip_on_big_endian_host(tmp_path, monkeypatch):
+    # Writer and reader swap to and from the little-endian file format
+    monkeypatch.setattr(fx_archive.sys, "byteorder", "big")
+    path = str(tmp_path / "ticks.spfx")
+    write_archive(path, TICKS)
+    with FxArchive(path) as archive:
+        assert archive.rates("USD/JPY").tolist() == TICKS["USD/JPY"][1].tolist()
+    assert TICKS["USD/JPY"][1].tolist() == [149_500_000, 149_612_345]
+
+
+def test_ticks_merge_pairs_in_time_order(path):
+    with FxArchive(path) as archive:
+        ticks = list(archive.ticks())
+        assert [pair for _, pair, _ in ticks] == ["USD/EUR", "USD/JPY", "USD/EUR", "USD/JPY", "USD/EUR"]
+        assert [timestamp for timestamp, _, _ in ticks] == sorted(timestamp for timestamp, _, _ in ticks)
+        assert [pair for _, pair, _ in archive.ticks(["USD/JPY"])] == ["USD/JPY", "USD/JPY"]
+
+
+def test_conversions(path):
+    with FxArchive(path) as archive:
+        assert archive.to_decimal(149_612_345) == Decimal("149.612345")
+        assert archive.to_datetime(START + 1_500_000) == datetime(2024, 1, 1, 0, 0, 1, 500_000, tzinfo=UTC)
+
+
+@pytest.mark.parametrize("via_service", [True, False])
+def test_replay_into_memory_storage(path, via_service):
+    storage = MemoryStorage()
+    with FxArchive(path) as archive:
+        count = replay(archive, storage, via_service=via_service)
+
+    assert count == 5
+    assert storage.clock == datetime(2024, 1, 1, 0, 0, 0, 40, tzinfo=UTC)
+    assert storage.get_latest_rate("USD/EUR").rate == Decimal("0.9025")
+    assert storage.get_latest_rate("USD/JPY").rate == Decimal("149.612345")
+
+
+def test_close_with_live_views(path):
+    archive = FxArchive(path)
+    rates = archive.rates("USD/EUR")
+    archive.close()
+    assert rates.tolist() == [900_000, 901_000, 902_500]
+
+
+def test_close_with_live_numpy_arrays(path):
+    pytest.importorskip("numpy")
+    with FxArchive(path) as archive:
+        timestamps, rates = archive.to_numpy("USD/JPY")
+    assert rates.tolist() == [149_500_000, 149_612_345]
+    assert timestamps[0] == START + 10
+
+
+def test_rejects_other_files(tmp_path):
+    path = tmp_path / "not-an-archive"
+    path.write_bytes(b"\0" * 64)
+    with pytest.raises(ValueError):
+        FxArchive(str(path))
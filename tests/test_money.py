@@ -0,0 +1,80 @@
+from decimal import Decimal
+import pytest
+
+from spherepay.money import Money, Rate, ratio
+
+
+def test_decimal_round_trip_is_exact():
+    amount = Money.from_decimal("1234.567891", "USD")
+    assert amount.units == 1_234_567_891
+    assert amount.to_decimal() == Decimal("1234.567891")
+
+
+def test_from_decimal_rounds_half_even_to_scale():
+    assert Money.from_decimal("0.0000005", "USD").units == 0
+    assert Money.from_decimal("0.0000015", "USD").units == 2
+    assert Money.from_decimal("-0.0000015", "USD").units == -2
+
+
+def test_round_half_even_to_currency_precision():
+    assert Money.from_decimal("1.005", "USD").round() == Money.from_decimal("1.00", "USD")
+    assert Money.from_decimal("1.015", "USD").round() == Money.from_decimal("1.02", "USD")
+    assert Money.from_decimal("-1.005", "USD").round() == Money.from_decimal("-1.00", "USD")
+    assert Money.from_decimal("-1.015", "USD").round() == Money.from_decimal("-1.02", "USD")
+    assert Money.from_decimal("2.5", "JPY").round() == Money.from_decimal("2", "JPY")
+    assert Money.from_decimal("3.5", "JPY").round() == Money.from_decimal("4", "JPY")
+
+
+def test_round_down_to_currency_precision():
+    assert Money.from_decimal("1.019999", "USD").round_down() == Money.from_decimal("1.01", "USD")
+    assert Money.from_decimal("-1.011", "USD").round_down() == Money.from_decimal("-1.02", "USD")
+    assert Money.from_decimal("99.9", "JPY").round_down() == Money.from_decimal("99", "JPY")
+
+
+def test_convert_rounds_to_scale():
+    amount = Money.from_decimal("100.00", "USD")
+    converted = amount.convert(Rate.from_decimal("0.912345"), "EUR")
+    assert converted == Money.from_decimal("91.2345", "EUR")
+    assert converted.currency == "EUR"
+
+
+def test_multiply_by_decimal_and_int():
+    amount = Money.from_decimal("10.00", "USD")
+    assert amount * Decimal("0.001") == Money.from_decimal("0.01", "USD")
+    assert amount * 3 == Money.from_decimal("30.00", "USD")
+
+
+def test_arithmetic_and_comparison():
+    a = Money.from_decimal("5.25", "EUR")
+    b = Money.from_decimal("1.75", "EUR")
+    assert a + b == Money.from_decimal("7", "EUR")
+    assert a - b == Money.from_decimal("3.5", "EUR")
+    assert -a < b < a
+    assert abs(-a) == a
+    assert not Money.zero("EUR")
+
+
+def test_currency_mismatch_is_rejected():
+    usd = Money.from_decimal("1", "USD")
+    eur = Money.from_decimal("1", "EUR")
+    with pytest.raises(ValueError):
+        usd + eur
+    with pytest.raises(ValueError):
+        usd < eur
+    with pytest.raises(TypeError):
+        usd + Decimal("1")
+    assert usd != eur
+
+
+def test_ratio():
+    reserved = Money.from_decimal("25", "USD")
+    balance = Money.from_decimal("100", "USD")
+    assert ratio(reserved, balance) == Decimal("0.25")
+    assert ratio(reserved, Money.zero("USD")) == Decimal("0")
+
+
+def test_rate_round_trip():
+    rate = Rate.from_decimal("149.123456")
+    assert rate.units == 149_123_456
+    assert rate == Rate.from_decimal(Decimal("149.1234560"))
+    assert str(rate) == "149.123456"
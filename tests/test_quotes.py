@@ -0,0 +1,115 @@
+from datetime import timedelta
+from decimal import Decimal
+from fastapi import BackgroundTasks, HTTPException
+from pydantic import ValidationError
+import pytest
+
+from spherepay import config
+from spherepay.cache import LocalCacheBackend
+from spherepay.money import Money, Rate
+from spherepay.schemas.quote import QuoteRequest
+from spherepay.schemas.transaction import TransactionRequest
+from spherepay.services import quote
+from spherepay.services.quote import QuoteService, apply_margin
+from spherepay.services.transaction import TransactionService
+
+
+def _request(amount="1000.00", target="EUR") -> QuoteRequest:
+    return QuoteRequest(source_currency="USD", target_currency=target, source_amount=amount)
+
+
+def test_quote_applies_margin_to_rate(storage):
+    response = QuoteService(storage).create_quote(_request())
+    assert Decimal(response.fx_rate) == Decimal("0.9")
+    assert Decimal(response.target_amount) == Decimal("899.10")
+    assert response.expires_at == storage.now() + timedelta(seconds=config.QUOTE_TTL_SECONDS)
+
+
+def test_quote_verifies_without_store(storage, monkeypatch):
+    quote_id = QuoteService(storage).create_quote(_request()).quote_id
+    monkeypatch.setattr(quote, "quote_store", LocalCacheBackend(max_entries=100))
+
+    verified = QuoteService(storage).get_quote(quote_id)
+    assert verified.quote_id == quote_id
+    assert Decimal(verified.target_amount) == Decimal("899.10")
+
+
+def test_tampered_quote_is_rejected(storage, monkeypatch):
+    quote_id = QuoteService(storage).create_quote(_request()).quote_id
+    monkeypatch.setattr(quote, "quote_store", LocalCacheBackend(max_entries=100))
+    payload, signature = quote_id.split(".")
+    forged = quote._b64encode(quote._b64decode(payload).replace(b"0.9", b"1.9"))
+
+    for bad_id in (f"{forged}.{signature}", "not-a-quote", f"{payload}.{signature}.x"):
+        with pytest.raises(HTTPException) as error:
+            QuoteService(storage).get_quote(bad_id)
+        assert error.value.detail == "Invalid quote"
+
+
+def test_quote_signed_with_another_key_is_rejected(storage, monkeypatch):
+    quote_id = QuoteService(storage).create_quote(_request()).quote_id
+    monkeypatch.setattr(quote, "quote_store", LocalCacheBackend(max_entries=100))
+    monkeypatch.setattr(config, "QUOTE_SIGNING_KEY", "another-worker")
+
+    with pytest.raises(HTTPException):
+        QuoteService(storage).get_quote(quote_id)
+
+
+def test_expired_quote_is_rejected(storage):
+    quote_id = QuoteService(storage).create_quote(_request()).quote_id
+    storage.clock += timedelta(seconds=config.QUOTE_TTL_SECONDS)
+
+    with pytest.raises(HTTPException) as error:
+        QuoteService(storage).get_quote(quote_id)
+    assert error.value.detail == "Quote has expired"
+
+
+def test_quote_funds_a_single_transfer(storage):
+    quote_id = QuoteService(storage).create_quote(_request()).quote_id
+    request = TransactionRequest(**_request().model_dump(), quote_id=quote_id)
+
+    transaction = TransactionService(storage).create_transaction(request, BackgroundTasks())
+    assert transaction.quote_id == quote_id
+
+    with pytest.raises(HTTPException) as error:
+        TransactionService(storage).create_transaction(request, BackgroundTasks())
+    assert error.value.detail == "Quote has already been used"
+    assert list(storage.transactions) == [transaction.id]
+
+
+def test_margin_revenue_never_below_margin_rate():
+    rate = Rate.from_decimal("149.5")
+    for amount in ("1", "3", "7", "10.01", "333.33"):
+        source_amount = Money.from_decimal(amount, "USD")
+        target_amount, revenue = apply_margin(source_amount, rate, "JPY")
+        base = source_amount.convert(rate, "JPY")
+        assert target_amount == target_amount.round()
+        assert target_amount + revenue == base
+        assert revenue >= base * config.TRANSACTION_MARGIN_RATE
+
+
+def test_converted_amount_must_fit_storage(storage):
+    request = _request("999999999999", target="JPY")
+    with pytest.raises(HTTPException) as error:
+        QuoteService(storage).create_quote(request)
+    assert error.value.status_code == 400
+
+    with pytest.raises(HTTPException) as error:
+        TransactionService(storage).create_transaction(TransactionRequest(**request.model_dump()), BackgroundTasks())
+    assert error.value.status_code == 400
+    assert storage.transactions == {}
+
+    QuoteService(storage).create_quote(_request("600000000000", target="JPY"))
+
+
+@pytest.mark.parametrize("amount", ["Infinity", "-Infinity", "NaN", "1e30", "0", "-5", "abc"])
+def test_invalid_amounts_are_rejected(amount):
+    with pytest.raises(ValidationError):
+        _request(amount)
+
+
+def test_amount_precision_follows_currency():
+    with pytest.raises(ValidationError):
+        QuoteRequest(source_currency="JPY", target_currency="USD", source_amount="100.5")
+    assert QuoteRequest(source_currency="JPY", target_currency="USD", source_amount="100").source_amount == "100"
+    assert Decimal(_request("0.01").source_amount) == Decimal("0.01")
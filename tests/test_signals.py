@@ -0,0 +1,111 @@
+from decimal import Decimal
+import pytest
+
+from spherepay import config
+from spherepay.money import Money
+from spherepay.signals import PoolSignal, decode_delta, encode_delta, pool_signal
+from spherepay.storage import MemoryStorage
+
+
+def usd(amount) -> Money:
+    return Money.from_decimal(str(amount), "USD")
+
+
+def _metrics(outgoing, balance) -> dict:
+    outgoing, balance = usd(outgoing), usd(balance)
+    return {"USD": {
+        "outgoing_volume": outgoing,
+        "utilization_rate": Decimal(outgoing.units) / Decimal(balance.units)
+    }}
+
+
+@pytest.fixture
+def thresholds(monkeypatch):
+    monkeypatch.setattr(config, "REBALANCE_HIGH_UTILIZATION", Decimal("0.7"))
+    monkeypatch.setattr(config, "REBALANCE_OUTFLOW_TRIGGER_RATIO", Decimal("0.05"))
+
+
+def test_windowed_outflow_crossing_high_utilization_triggers(thresholds):
+    signal = PoolSignal()
+    signal.reset(_metrics(680, 1000))
+
+    # Offsetting inflows keep the net outflow below its trigger
+    signal.publish(-usd(10), usd(1000))
+    signal.publish(usd(10), usd(1000))
+    assert not signal.triggered
+
+    signal.publish(-usd(15), usd(1000))
+    assert signal.triggered
+
+
+def test_pool_already_above_high_utilization_does_not_retrigger(thresholds):
+    signal = PoolSignal()
+    signal.reset(_metrics(800, 1000))
+
+    signal.publish(-usd(10), usd(1000))
+    signal.publish(usd(10), usd(1000))
+    assert not signal.triggered
+
+
+def test_net_outflow_accumulates_until_ratio(thresholds):
+    signal = PoolSignal()
+    signal.reset(_metrics(0, 1000))
+
+    for _ in range(5):
+        signal.publish(-usd(10), usd(1000))
+    assert not signal.triggered
+
+    signal.publish(usd(5), usd(1000))
+    signal.publish(-usd(5), usd(1000))
+    assert not signal.triggered
+
+    signal.publish(-usd(1), usd(1000))
+    assert signal.triggered
+
+
+def test_reset_clears_flows_and_trigger(thresholds):
+    signal = PoolSignal()
+    signal.reset(_metrics(0, 1000))
+    signal.publish(-usd(60), usd(1000))
+    assert signal.triggered
+
+    signal.reset(_metrics(60, 1000))
+    assert not signal.triggered
+    signal.publish(-usd(40), usd(1000))
+    assert not signal.triggered
+
+
+def test_empty_pool_counts_as_fully_utilized(thresholds):
+    signal = PoolSignal()
+    signal.reset()
+    signal.publish(Money.zero("USD"), Money.zero("USD"))
+    assert signal.triggered
+
+
+def test_receive_decodes_payloads(thresholds):
+    payload = encode_delta(-usd("60.5"), usd(1000))
+    assert decode_delta(payload) == (-usd("60.5"), usd(1000))
+
+    signal = PoolSignal()
+    signal.reset()
+    signal.receive("garbage")
+    assert not signal.triggered
+    signal.receive(payload)
+    assert signal.triggered
+
+
+def test_memory_storage_publishes_on_commit_only(thresholds):
+    storage = MemoryStorage({"USD": 1000})
+    pool_signal.reset()
+    try:
+        storage.notify_pool_delta(-usd(100), usd(1000))
+        storage.rollback()
+        storage.commit()
+        assert not pool_signal.triggered
+
+        storage.notify_pool_delta(-usd(100), usd(1000))
+        assert not pool_signal.triggered
+        storage.commit()
+        assert pool_signal.triggered
+    finally:
+        pool_signal.reset()
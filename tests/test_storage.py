@@ -0,0 +1,90 @@
+from datetime import datetime, UTC, timedelta
+from decimal import Decimal
+
+from spherepay.models.fx_rate import FxRate
+from spherepay.models.transaction import Transaction, TransactionStatus
+from spherepay.storage import MemoryStorage
+
+START = datetime(2024, 1, 1, tzinfo=UTC)
+
+
+def _transaction(**overrides) -> Transaction:
+    values = dict(
+        source_currency="USD",
+        target_currency="EUR",
+        source_amount=Decimal("100"),
+        target_amount=Decimal("90"),
+        fx_rate=Decimal("0.9"),
+        margin=Decimal("0.001"),
+        revenue=Decimal("0.09"),
+        status=TransactionStatus.PENDING
+    )
+    values.update(overrides)
+    return Transaction(**values)
+
+
+def test_commit_applies_pending_rows():
+    storage = MemoryStorage({"USD": 1000, "EUR": 1000}, clock=START)
+    storage.add_rate(FxRate(currency_pair="USD/EUR", rate=Decimal("0.9"), timestamp=START))
+    transaction = _transaction()
+    storage.add_transaction(transaction)
+    assert storage.get_latest_rate("USD/EUR") is None
+
+    storage.commit()
+
+    assert storage.get_latest_rate("USD/EUR").rate == Decimal("0.9")
+    assert transaction.id == 1
+    assert transaction.created_at == START
+    assert storage.get_transaction(1) is transaction
+    assert storage.get_flow_volumes("EUR", START) == (Decimal("90"), Decimal("0"))
+    assert storage.get_flow_volumes("USD", START) == (Decimal("0"), Decimal("100"))
+
+
+def test_commit_keeps_latest_rate():
+    storage = MemoryStorage(clock=START)
+    storage.add_rate(FxRate(currency_pair="USD/EUR", rate=Decimal("0.9"), timestamp=START))
+    storage.add_rate(FxRate(currency_pair="USD/EUR", rate=Decimal("0.8"), timestamp=START - timedelta(seconds=1)))
+    storage.commit()
+    assert storage.get_latest_rate("USD/EUR").rate == Decimal("0.9")
+
+
+def test_rollback_restores_pools_and_discards_rows():
+    storage = MemoryStorage({"USD": 1000, "EUR": 1000}, clock=START)
+    pool = storage.get_pool("USD")
+    pool.reserved_balance += Decimal("200")
+    storage.commit()
+
+    pools = storage.lock_pools("USD", "EUR")
+    pools["USD"].balance -= Decimal("200")
+    pools["USD"].reserved_balance -= Decimal("200")
+    pools["EUR"].balance += Decimal("180")
+    storage.add_rate(FxRate(currency_pair="USD/EUR", rate=Decimal("0.9"), timestamp=START))
+    storage.add_transaction(_transaction())
+
+    storage.rollback()
+
+    assert storage.get_pool("USD").balance == Decimal("1000")
+    assert storage.get_pool("USD").reserved_balance == Decimal("200")
+    assert storage.get_pool("EUR").balance == Decimal("1000")
+    assert storage.get_latest_rate("USD/EUR") is None
+    assert storage.get_transaction(1) is None
+
+
+def test_flow_volumes_expire_with_window():
+    storage = MemoryStorage(clock=START)
+    storage.add_transaction(_transaction())
+    storage.commit()
+    storage.clock = START + timedelta(hours=2)
+    storage.add_transaction(_transaction(target_amount=Decimal("45"), source_amount=Decimal("50")))
+    storage.commit()
+
+    assert storage.get_flow_volumes("EUR", START + timedelta(hours=1)) == (Decimal("45"), Decimal("0"))
+
+
+def test_max_transactions_evicts_oldest():
+    storage = MemoryStorage(clock=START, max_transactions=2)
+    for _ in range(3):
+        storage.add_transaction(_transaction())
+        storage.commit()
+    assert storage.get_transaction(1) is None
+    assert storage.get_transaction(3) is not None
@@ -0,0 +1,49 @@
+import asyncio
+import threading
+
+from spherepay import tasks
+
+
+class FakeLeadership:
+    def __init__(self, events: list):
+        self.events = events
+        self.connection = object()
+
+    def ensure(self) -> bool:
+        return True
+
+    def poll_signals(self) -> list[str]:
+        return []
+
+    def release(self):
+        self.events.append("release")
+
+
+def test_shutdown_waits_for_running_rebalance_before_release(monkeypatch):
+    events = []
+    started = threading.Event()
+    finish = threading.Event()
+
+    def run_rebalance():
+        started.set()
+        finish.wait(5)
+        events.append("rebalanced")
+
+    monkeypatch.setattr(tasks, "RebalancerLeadership", lambda: FakeLeadership(events))
+    monkeypatch.setattr(tasks, "run_rebalance", run_rebalance)
+
+    async def run():
+        task = asyncio.create_task(tasks.rebalance_pools_task())
+        await asyncio.to_thread(started.wait, 5)
+        task.cancel()
+        await asyncio.sleep(0.05)
+        # Cancelled mid-run: leadership must still be held
+        assert events == []
+        finish.set()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+    asyncio.run(run())
+    assert events == ["rebalanced", "release"]